@@ -19,6 +19,7 @@ fileConfig(config.config_file_name)
 from app.models.base import Base
 from app.models.user import User
 from app.models.job import Job
+from app.models.sync_state import SyncState
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,50 @@
+"""unique job title
+
+Revision ID: 3b7d2a91c4e5
+Revises: e9de1149fc7d
+Create Date: 2026-10-18 10:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d2a91c4e5'
+down_revision: Union[str, None] = 'e9de1149fc7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicates listed in the error message
+MAX_REPORTED = 20
+
+
+def check_duplicate_titles() -> None:
+    """The unique index cannot be built over duplicated titles; they are left for the operator to resolve."""
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT title, COUNT(*), MIN(id), MAX(id) FROM jobs GROUP BY title HAVING COUNT(*) > 1 "
+        "ORDER BY title LIMIT :limit"
+    ), {"limit": MAX_REPORTED + 1}).all()
+    if not duplicates:
+        return
+
+    lines = [f"  {title!r}: {count} rows, ids {min_id}..{max_id}" for title, count, min_id, max_id in duplicates[:MAX_REPORTED]]
+    if len(duplicates) > MAX_REPORTED:
+        lines.append("  ...")
+    raise RuntimeError(
+        "jobs.title is not unique, rename or delete the duplicates and run the migration again:\n" + "\n".join(lines)
+    )
+
+
+def upgrade() -> None:
+    check_duplicate_titles()
+    op.drop_index('ix_jobs_title', table_name='jobs')
+    op.create_index(op.f('ix_jobs_title'), 'jobs', ['title'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_jobs_title'), table_name='jobs')
+    op.create_index(op.f('ix_jobs_title'), 'jobs', ['title'], unique=False)
@@ -0,0 +1,30 @@
+"""job updated_at
+
+Revision ID: 5e0a8b3f7d21
+Revises: c52e9f07ab13
+Create Date: 2026-10-18 13:48:52.663017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0a8b3f7d21'
+down_revision: Union[str, None] = 'c52e9f07ab13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE jobs SET updated_at = created_at")
+    op.alter_column('jobs', 'updated_at', nullable=False)
+    op.create_index('ix_jobs_id_updated_at', 'jobs', ['id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_id_updated_at', table_name='jobs')
+    op.drop_column('jobs', 'updated_at')
@@ -0,0 +1,32 @@
+"""job listing indexes
+
+Revision ID: 8f41c6d2e0a7
+Revises: 3b7d2a91c4e5
+Create Date: 2026-10-18 11:02:17.540921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41c6d2e0a7'
+down_revision: Union[str, None] = '3b7d2a91c4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_status_created_at_id', 'jobs', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_company_name_created_at_id', 'jobs', ['company_name', 'created_at', 'id'], unique=False)
+    op.create_index('ix_jobs_company_address_created_at_id', 'jobs', ['company_address', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_company_address_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_company_name_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_status_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
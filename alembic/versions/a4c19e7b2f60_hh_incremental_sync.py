@@ -0,0 +1,57 @@
+"""hh incremental sync
+
+Revision ID: a4c19e7b2f60
+Revises: 5e0a8b3f7d21
+Create Date: 2026-10-18 16:05:37.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c19e7b2f60'
+down_revision: Union[str, None] = '5e0a8b3f7d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('external_id', sa.String(), nullable=True))
+    op.add_column('jobs', sa.Column('published_at', sa.DateTime(), nullable=True))
+    op.add_column('jobs', sa.Column('content_hash', sa.String(), nullable=True))
+    op.create_index('ix_jobs_external_id', 'jobs', ['external_id'], unique=True)
+    # Vacancies from hh.ru may share a title, so the title stays unique only among the others
+    op.drop_index('ix_jobs_title', table_name='jobs')
+    op.create_index(
+        'ix_jobs_title', 'jobs', ['title'], unique=True, postgresql_where=sa.text('external_id IS NULL')
+    )
+
+    op.create_table(
+        'sync_state',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_state')
+
+    # hh.ru vacancies may share titles; they are left for the operator rather than deleted here
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT COUNT(*) FROM (SELECT title FROM jobs GROUP BY title HAVING COUNT(*) > 1) AS duplicated"
+    )).scalar_one()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} titles are shared by several vacancies, rename or delete them before downgrading"
+        )
+    op.drop_index('ix_jobs_title', table_name='jobs')
+    op.create_index('ix_jobs_title', 'jobs', ['title'], unique=True)
+    op.drop_index('ix_jobs_external_id', table_name='jobs')
+    op.drop_column('jobs', 'content_hash')
+    op.drop_column('jobs', 'published_at')
+    op.drop_column('jobs', 'external_id')
@@ -8,13 +8,112 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     POSTGRES_PASSWORD: str
     POSTGRES_PORT: int
+    # Async engine (asyncpg/aiosqlite); set DATABASE_ASYNC=false to fall back to the sync driver
+    DATABASE_ASYNC: bool = True
+    DATABASE_ASYNC_URL: str | None = None
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_MAX_OVERFLOW: int = 40
+    # Read replicas, comma-separated URLs; reads are spread over the healthy ones
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 5.0  # seconds between replica health checks
+    DATABASE_REPLICA_CHECK_TIMEOUT: float = 1.0
+    DATABASE_STICKY_SECONDS: int = 5  # reads go to the primary for this long after a client's write
     REDIS_HOST: str = "redis" # в .env заменить на REDIS_HOST=redis
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_POOL_SIZE: int = 50
+    REDIS_POOL_TIMEOUT: float = 1.0  # wait for a free connection
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_COMMAND_TIMEOUT: float = 0.5
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # In-process cache of verified tokens
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: float = 5.0  # revalidation window, seconds
+    TOKEN_CACHE_CHANNEL: str = "auth:token-invalidation"
+
+    # Redis read-through cache for vacancies
+    JOB_CACHE_TTL: int = 300
+    JOB_CACHE_MISSING_TTL: int = 30
+    JOB_CACHE_LOCK_TIMEOUT: float = 2.0
+
+    # Background parse tasks
+    PARSE_WORKER_CONCURRENCY: int = 2  # tasks run at once by one worker process
+    PARSE_QUEUE_POLL: float = 5.0  # seconds a worker blocks waiting for a task
+    PARSE_TASK_TTL: int = 86400  # seconds a finished task status is kept
+    PARSE_DEDUP_TTL: int = 3600  # upper bound for an identical query to stay "in flight"
+    PARSE_HEARTBEAT_INTERVAL: float = 10.0  # seconds between worker heartbeats and stale task sweeps
+    PARSE_HEARTBEAT_TTL: int = 60  # a worker silent for this long is considered dead, its tasks are requeued
+    PARSE_TASK_MAX_ATTEMPTS: int = 3  # a task requeued this many times is marked failed instead
+
+    # Sliding-window rate limits, "count/period" (period: second, minute, hour, day or seconds)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOGIN_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_USERNAME: str = "5/minute"
+    RATE_LIMIT_REGISTER_IP: str = "10/minute"
+    RATE_LIMIT_PARSE_IP: str = "30/minute"
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # take the client address from X-Forwarded-For
+    RATE_LIMIT_MEMORY_KEYS: int = 100000  # keys kept by the in-process fallback
+
+    # Bulk import
+    IMPORT_CHUNK_SIZE: int = 5000  # rows validated and copied at a time
+    IMPORT_MAX_ERRORS: int = 1000  # row errors included in the report
+
+    # hh.ru ingestion
+    HH_API_URL: str = "https://api.hh.ru"
+    HH_USER_AGENT: str = "auth-fastapi/1.0"
+    HH_TIMEOUT: float = 10.0
+    HH_MAX_CONNECTIONS: int = 20
+    HH_CONCURRENCY: int = 5  # pages fetched in parallel per request
+    HH_MAX_RETRIES: int = 3
+    HH_BACKOFF: float = 0.5  # seconds, doubled on every retry
+    HH_SYNC_OVERLAP: int = 600  # seconds before the watermark that a sync asks for again, for late-indexed vacancies
+
+    # Password hashing: "bcrypt" or "argon2" (argon2id, needs argon2-cffi).
+    # Hashes with other parameters are upgraded on login.
+    PASSWORD_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_BUDGET_MS: float = 250.0  # target time per hash for calibration
+    PASSWORD_CALIBRATE: bool = False  # calibrate the cost to the budget at startup
+
+    # Password hashing pool: "thread" or "process"
+    HASHING_EXECUTOR: str = "thread"
+    HASHING_WORKERS: int = 4
+    HASHING_QUEUE_LIMIT: int = 64
+
+    # Startup: "create" tables from the models, "check" that the database is at the Alembic head, or "none"
+    SCHEMA_MODE: str = "create"
+    STARTUP_TIMEOUT: float = 5.0  # per startup step (database, Redis, HTTP client)
+    STARTUP_RETRY_INTERVAL: float = 5.0  # database re-check while the instance is not ready
+
+    # Prometheus metrics
+    METRICS_ENABLED: bool = True  # serve GET /metrics
+    WORKER_METRICS_PORT: int = 0  # parse worker metrics port, 0 disables
+
+    # Vacancy logos cached on disk and served by GET /vacancy/{job_id}/logo
+    LOGO_CACHE_DIR: str = "data/logos"
+    LOGO_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # least recently used files are evicted above this
+    LOGO_MAX_BYTES: int = 2 * 1024 * 1024  # larger images are not downloaded
+    LOGO_ALLOWED_HOSTS: str = "hhcdn.ru,hh.ru"  # comma-separated, subdomains included
+    LOGO_THUMBNAIL_SIZES: list[int] = [64, 128, 256]
+    LOGO_FETCH_TIMEOUT: float = 5.0
+    LOGO_MAX_AGE: int = 86400  # Cache-Control max-age of logo responses
+    LOGO_TOUCH_INTERVAL: int = 3600  # seconds between LRU refreshes of a cached file
+    LOGO_PREFETCH: bool = True  # download logos in the background while parsing
+    LOGO_PREFETCH_CONCURRENCY: int = 4
+
+    # Logging: records are formatted and written by a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread; more are dropped
+    # Share of requests whose INFO logs are kept, by path prefix, e.g. {"/vacancy/get": 0.01}
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
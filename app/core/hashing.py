@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.password_policy import PasswordPolicy, context_for
+from app.core.metrics import HASHING_DURATION, HASHING_QUEUE_WAIT, HASHING_REJECTED
+
+logger = logging.getLogger(__name__)
+
+
+def _run_timed(operation: str, args: tuple, submitted_at: float, policy: PasswordPolicy):
+    # The policy comes from the caller, so process workers hash exactly like the API process
+    context = context_for(policy)
+
+    # time.monotonic() is system-wide, so it is comparable across processes
+    started_at = time.monotonic()
+    result = getattr(context, operation)(*args)
+    finished_at = time.monotonic()
+    return result, started_at - submitted_at, finished_at - started_at
+
+
+class HashingExecutor:
+    """
+    Bounded pool for bcrypt work.
+    - Keeps CPU-heavy hashing off the event loop.
+    - Rejects new work with 503 once `workers + queue_limit` calls are in flight.
+    """
+
+    def __init__(self, kind: str, workers: int, queue_limit: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.capacity = workers + queue_limit
+        self.in_flight = 0
+        self._executor: Executor | None = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+        logger.info(
+            "✅ Hashing executor started (%s, workers=%s, capacity=%s)", self.kind, self.workers, self.capacity
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, operation: str, *args, policy: PasswordPolicy):
+        if self._executor is None:
+            self.start()
+        if self.in_flight >= self.capacity:
+            HASHING_REJECTED.inc()
+            logger.warning("⚠️ Hashing queue is full, rejecting request")
+            raise HTTPException(status_code=503, detail="Server is busy, try again later")
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, queue_wait, run = await loop.run_in_executor(
+                self._executor, _run_timed, operation, args, time.monotonic(), policy
+            )
+        finally:
+            self.in_flight -= 1
+
+        # Queue wait and run time per call; exposed on /metrics
+        HASHING_QUEUE_WAIT.labels(operation).observe(queue_wait)
+        HASHING_DURATION.labels(operation).observe(run)
+        return result
+
+
+hashing_executor = HashingExecutor(
+    kind=settings.HASHING_EXECUTOR,
+    workers=settings.HASHING_WORKERS,
+    queue_limit=settings.HASHING_QUEUE_LIMIT,
+)
@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from app.core.responses import JSON_MEDIA_TYPE, negotiated_media_type, vary_headers
+from app.models.job import MOSCOW_TZ
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive Moscow time
+    if value.tzinfo is None:
+        value = MOSCOW_TZ.localize(value)
+    return value.astimezone(timezone.utc)
+
+
+def _version(job_id: int, updated_at: datetime) -> str:
+    return f"{job_id}-{int(_as_utc(updated_at).timestamp() * 1_000_000):x}"
+
+
+def _encoding_suffix() -> str:
+    # JSON and MessagePack bodies of one version are different representations, so their strong ETags differ
+    media_type = negotiated_media_type()
+    return "" if media_type == JSON_MEDIA_TYPE else "." + media_type.rsplit("/", 1)[-1]
+
+
+def version_etag(job_id: int, updated_at: datetime) -> str:
+    return f'"{_version(job_id, updated_at)}{_encoding_suffix()}"'
+
+
+def collection_etag(versions: list[tuple[int, datetime]], *extra) -> str:
+    digest = hashlib.sha1()
+    for job_id, updated_at in versions:
+        digest.update(_version(job_id, updated_at).encode())
+    for value in extra:
+        digest.update(repr(value).encode())
+    return f'"{digest.hexdigest()}{_encoding_suffix()}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: datetime | None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def has_conditional_headers(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(etag: str, last_modified: datetime | None) -> Response:
+    # Same Vary as the 200 it stands for, see APIResponse
+    return Response(status_code=304, headers={**cache_headers(etag, last_modified), **vary_headers()})
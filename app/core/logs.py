@@ -0,0 +1,157 @@
+"""
+Logging setup shared by the API and the parse worker.
+- Nothing is written on the calling thread: records go through a bounded queue to a
+  QueueListener thread, which formats them (JSON or text) and writes them to stderr.
+- Messages keep their %-style arguments until the writer thread renders them, so pass
+  immutable values (ids, names, counts) rather than objects that change afterwards.
+- Every HTTP request gets an id (X-Request-ID) that is attached to its records and echoed back.
+- LOG_SAMPLE_RATES keeps the INFO records of only a share of the requests on busy paths;
+  warnings and errors are always kept.
+"""
+import atexit
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+LOG_FORMATS = ("json", "text")
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+REQUEST_ID_HEADER = b"x-request-id"
+# Incoming ids are echoed into headers and logs, so only short plain tokens are accepted
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,128}")
+# uvicorn attaches its own synchronous handlers to these
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_sampled: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.request_id is not None:
+            payload["request_id"] = record.request_id
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return orjson.dumps(payload).decode()
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    The stock QueueHandler renders `msg % args` on the calling thread before queueing;
+    this one only captures the request id and leaves formatting to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id.get()
+        if record.exc_info:
+            # Tracebacks keep whole frames alive, render them now (errors only)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Losing a log line is better than blocking a request on a slow stderr
+            LOG_RECORDS_DROPPED.inc()
+
+
+class SamplingFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+def setup_logging():
+    """Routes the root and uvicorn loggers through the queue. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+    if settings.LOG_FORMAT not in LOG_FORMATS:
+        raise ValueError(f"Unknown LOG_FORMAT: {settings.LOG_FORMAT}")
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+    for name in UVICORN_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Writes out the records still queued and stops the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware: assigns the request id and makes the sampling decision once per request."""
+
+    def __init__(self, app):
+        self.app = app
+        # Longest prefix first, so "/vacancy/get" wins over "/vacancy"
+        self.sample_rates = sorted(settings.LOG_SAMPLE_RATES.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def sample_rate(self, path: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return 1.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                incoming = value.decode("latin-1")
+                break
+        current_id = incoming if incoming and _REQUEST_ID_PATTERN.fullmatch(incoming) else uuid.uuid4().hex
+        rate = self.sample_rate(scope["path"])
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, current_id.encode())]
+            await send(message)
+
+        id_token = request_id.set(current_id)
+        sampled_token = _sampled.set(rate >= 1.0 or random.random() < rate)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(id_token)
+            _sampled.reset(sampled_token)
@@ -0,0 +1,162 @@
+import os
+import time
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.exceptions import HTTPException
+
+# Sub-millisecond buckets for Redis and pool checkouts, the defaults suit HTTP and hh.ru
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+HASHING_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time spent in route handlers", ["method", "route"]
+)
+HTTP_REQUESTS = Counter("http_requests_total", "Handled requests", ["method", "route", "status"])
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", ["method", "route"], multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool, incl. connecting", ["engine"],
+    buckets=FAST_BUCKETS,
+)
+DB_REPLICA_HEALTHY = Gauge(
+    "db_replica_healthy", "1 while the replica passes health checks", ["replica"], multiprocess_mode="min"
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds", "Redis command round trips", ["command"], buckets=FAST_BUCKETS
+)
+REDIS_COMMAND_ERRORS = Counter("redis_command_errors_total", "Failed Redis commands", ["command"])
+
+HASHING_DURATION = Histogram(
+    "password_hashing_seconds", "bcrypt run time in the hashing pool", ["operation"], buckets=HASHING_BUCKETS
+)
+HASHING_QUEUE_WAIT = Histogram(
+    "password_hashing_queue_wait_seconds", "Wait for a free hashing worker", ["operation"], buckets=HASHING_BUCKETS
+)
+HASHING_REJECTED = Counter("password_hashing_rejected_total", "Hashing calls rejected with 503")
+
+STARTUP_DURATION = Gauge(
+    "app_startup_seconds", "Module import and lifespan startup time", ["phase"], multiprocess_mode="max"
+)
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+
+HH_FETCH_DURATION = Histogram("hh_fetch_duration_seconds", "hh.ru page requests, per attempt", ["outcome"])
+HH_FETCH_RETRIES = Counter("hh_fetch_retries_total", "hh.ru page requests that were retried")
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Route class that times its handler, labelled by the route template rather than the raw path.
+    Streaming responses are timed until the response starts.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        method = ",".join(sorted(self.methods))
+        route = self.path_format
+        series = None
+
+        async def instrumented_handler(request):
+            nonlocal series
+            # Resolved on first use: include_router re-creates routes with the prefixed path,
+            # and the unprefixed originals should not show up as empty series
+            if series is None:
+                series = HTTP_REQUEST_DURATION.labels(method, route), HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+            duration, in_progress = series
+
+            status = 500
+            in_progress.inc()
+            started_at = time.perf_counter()
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                duration.observe(time.perf_counter() - started_at)
+                in_progress.dec()
+                HTTP_REQUESTS.labels(method, route, status).inc()
+
+        return instrumented_handler
+
+
+class PoolCollector:
+    """Reads pool occupancy at scrape time, so checkouts themselves pay nothing for it."""
+
+    def __init__(self):
+        self._engines = {}
+
+    def add(self, name: str, engine):
+        self._engines[name] = engine
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections above pool_size", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool_size", labels=["engine"])
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(0, pool.overflow()))
+            size.add_metric([name], pool.size())
+        yield from (checked_out, overflow, size)
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+class _TimedCheckout:
+    engine_label = "sync"
+    # Log under the stock pool loggers, which SQLAlchemy keeps at WARNING
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.labels(self.engine_label).observe(time.perf_counter() - started_at)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Prometheus text exposition.
+    With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to aggregate them
+    (pool gauges are then left out, they are per process).
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,187 @@
+"""
+Password hashing parameters and their calibration.
+
+Print the parameters that fit a latency budget on this machine:
+    python -m app.core.password_policy --budget 250 [--scheme argon2]
+"""
+import argparse
+import logging
+import statistics
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("bcrypt", "argon2")
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+ARGON2_MAX_TIME_COST = 20
+CALIBRATION_SAMPLES = 3
+CALIBRATION_SECRET = "calibration-password"
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    """
+    Hashable and picklable, so process-pool workers receive the exact policy
+    of the API process instead of rebuilding it from their own settings.
+    """
+
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+
+
+def argon2_available() -> bool:
+    from passlib.hash import argon2
+
+    return argon2.has_backend()
+
+
+def policy_from_settings() -> PasswordPolicy:
+    scheme = settings.PASSWORD_SCHEME
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown PASSWORD_SCHEME: {scheme}")
+    if scheme == "argon2" and not argon2_available():
+        logger.critical("🚨 PASSWORD_SCHEME=argon2 needs argon2-cffi (pip install argon2-cffi), using bcrypt")
+        scheme = "bcrypt"
+    return PasswordPolicy(
+        scheme=scheme,
+        bcrypt_rounds=settings.BCRYPT_ROUNDS,
+        argon2_time_cost=settings.ARGON2_TIME_COST,
+        argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2_parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+def is_weaker(policy: PasswordPolicy, scheme: str, hash: str) -> bool:
+    """
+    True when `hash` is cheaper to brute-force than the policy asks for.
+    Hashes at or above the policy cost are left alone, so lowering the cost
+    (or workers that disagree about it) never downgrades stored hashes.
+    """
+    if scheme != policy.scheme:
+        return True
+    if scheme == "bcrypt":
+        from passlib.hash import bcrypt
+
+        return bcrypt.from_string(hash).rounds < policy.bcrypt_rounds
+
+    from passlib.hash import argon2
+
+    parsed = argon2.from_string(hash)
+    return (
+        parsed.type != "id"
+        or parsed.rounds < policy.argon2_time_cost
+        or parsed.memory_cost < policy.argon2_memory_cost
+    )
+
+
+class PolicyContext(CryptContext):
+    """CryptContext whose `needs_update` only flags hashes weaker than the policy (passlib also flags stronger ones)."""
+
+    def __init__(self, policy: PasswordPolicy, **kwargs):
+        super().__init__(**kwargs)
+        self.password_policy = policy
+
+    def needs_update(self, hash, scheme=None, category=None, secret=None) -> bool:
+        return is_weaker(self.password_policy, self.identify(hash, required=True), hash)
+
+    def verify_and_update(self, secret, hash, scheme=None, category=None, **kwargs):
+        if not self.verify(secret, hash, scheme=scheme, category=category, **kwargs):
+            return False, None
+        if self.needs_update(hash):
+            return True, self.hash(secret)
+        return True, None
+
+
+@lru_cache(maxsize=8)
+def context_for(policy: PasswordPolicy) -> PolicyContext:
+    """
+    New hashes use `policy.scheme` and its cost. Hashes of the other scheme, or
+    with a lower cost, verify fine but report `needs_update`, so they get
+    rehashed on the next login.
+    """
+    schemes = [policy.scheme] + [scheme for scheme in SCHEMES if scheme != policy.scheme]
+    if "argon2" in schemes and not argon2_available():
+        schemes.remove("argon2")
+
+    options = {
+        "bcrypt__default_rounds": policy.bcrypt_rounds,
+        "bcrypt__min_rounds": policy.bcrypt_rounds,
+    }
+    if "argon2" in schemes:
+        options.update({
+            "argon2__type": "ID",
+            "argon2__time_cost": policy.argon2_time_cost,
+            "argon2__min_rounds": policy.argon2_time_cost,
+            "argon2__memory_cost": policy.argon2_memory_cost,
+            "argon2__parallelism": policy.argon2_parallelism,
+        })
+    return PolicyContext(policy, schemes=schemes, deprecated="auto", **options)
+
+
+def measure(policy: PasswordPolicy, samples: int = CALIBRATION_SAMPLES) -> float:
+    """Median seconds per hash with the given policy."""
+    context = context_for(policy)
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        context.hash(CALIBRATION_SECRET)
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def calibrate(policy: PasswordPolicy, budget_ms: float) -> PasswordPolicy:
+    """Highest cost whose hash time stays within `budget_ms` on this machine."""
+    budget = budget_ms / 1000
+
+    if policy.scheme == "argon2":
+        # Memory and parallelism stay as configured, the time cost scales linearly
+        calibrated = replace(policy, argon2_time_cost=1)
+        for time_cost in range(2, ARGON2_MAX_TIME_COST + 1):
+            candidate = replace(policy, argon2_time_cost=time_cost)
+            if measure(candidate) > budget:
+                break
+            calibrated = candidate
+        return calibrated
+
+    # Every bcrypt round doubles the work: extrapolate from a cheap measurement, then confirm
+    base_rounds = 8
+    per_unit = measure(replace(policy, bcrypt_rounds=base_rounds)) / 2 ** base_rounds
+    rounds = base_rounds
+    while rounds < BCRYPT_MAX_ROUNDS and per_unit * 2 ** (rounds + 1) <= budget:
+        rounds += 1
+    while rounds > BCRYPT_MIN_ROUNDS and measure(replace(policy, bcrypt_rounds=rounds), samples=1) > budget:
+        rounds -= 1
+    return replace(policy, bcrypt_rounds=rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=settings.PASSWORD_HASH_BUDGET_MS, help="milliseconds per hash")
+    parser.add_argument("--scheme", choices=SCHEMES, default=settings.PASSWORD_SCHEME)
+    args = parser.parse_args()
+    if args.scheme == "argon2" and not argon2_available():
+        parser.error("argon2 needs argon2-cffi: pip install argon2-cffi")
+
+    policy = calibrate(replace(policy_from_settings(), scheme=args.scheme), args.budget)
+    print(f"{measure(policy) * 1000:.1f} ms per hash with:")
+    print(f"PASSWORD_SCHEME={policy.scheme}")
+    if policy.scheme == "argon2":
+        print(f"ARGON2_TIME_COST={policy.argon2_time_cost}")
+        print(f"ARGON2_MEMORY_COST={policy.argon2_memory_cost}")
+        print(f"ARGON2_PARALLELISM={policy.argon2_parallelism}")
+    else:
+        print(f"BCRYPT_ROUNDS={policy.bcrypt_rounds}")
+
+
+if __name__ == "__main__":
+    main()
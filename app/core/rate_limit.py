@@ -0,0 +1,190 @@
+import logging
+import math
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Sliding window over a sorted set of request timestamps (ms), atomic per key.
+# Returns {allowed, remaining, retry_after_ms}.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, 0, tonumber(oldest[2]) + window - now}
+"""
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    window: float  # seconds
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parses "5/minute", "100/hour" or "20/30" (20 requests per 30 seconds)."""
+        count, _, period = value.partition("/")
+        period = period.strip().lower()
+        if period.replace(".", "", 1).isdigit():
+            window = float(period)
+        else:
+            window = PERIODS.get(period.rstrip("s"))
+        if not window:
+            raise ValueError(f"Invalid rate: {value!r}")
+        return cls(int(count), float(window))
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the next request is allowed
+
+
+class MemoryWindow:
+    """In-process fallback used while Redis is unavailable; limits are per process."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (window of the rate it was last hit with, hit times)
+        self._hits: dict[str, tuple[float, deque[float]]] = {}
+
+    def hit(self, key: str, rate: Rate) -> Decision:
+        now = time.monotonic()
+        entry = self._hits.get(key)
+        if entry is None:
+            if len(self._hits) >= self.max_keys:
+                self._sweep(now)
+            hits = deque()
+        else:
+            _, hits = entry
+        self._hits[key] = (rate.window, hits)
+
+        while hits and hits[0] <= now - rate.window:
+            hits.popleft()
+        if len(hits) < rate.limit:
+            hits.append(now)
+            return Decision(True, rate.limit - len(hits), 0.0)
+        return Decision(False, 0, hits[0] + rate.window - now)
+
+    def _sweep(self, now: float):
+        # Each key expires by its own window: a short limit must not drop the history of a long one
+        for key in [key for key, (window, hits) in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+        # Still full: forget the oldest keys rather than grow without bound
+        while len(self._hits) >= self.max_keys:
+            del self._hits[next(iter(self._hits))]
+
+    def clear(self):
+        self._hits.clear()
+
+
+memory_window = MemoryWindow(settings.RATE_LIMIT_MEMORY_KEYS)
+_script = None
+
+
+def _sliding_window(redis_client: aioredis.Redis):
+    global _script
+
+    if _script is None or _script.registered_client is not redis_client:
+        _script = redis_client.register_script(SLIDING_WINDOW_LUA)
+    return _script
+
+
+async def hit(redis_client: aioredis.Redis | None, key: str, rate: Rate) -> Decision:
+    if redis_client is not None:
+        try:
+            allowed, remaining, retry_after_ms = await _sliding_window(redis_client)(
+                keys=[key], args=[rate.limit, int(rate.window * 1000), uuid.uuid4().hex]
+            )
+            return Decision(bool(allowed), int(remaining), int(retry_after_ms) / 1000)
+        except RedisError:
+            logger.error("⚠️ Error while checking rate limit in Redis, using the in-process limiter")
+    return memory_window.hit(key, rate)
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def request_username(request: Request) -> str | None:
+    """Username from a JSON or form body; the body is cached, so the endpoint can still read it."""
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+        elif content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            body = await request.form()
+        else:
+            return None
+    except ValueError:
+        return None
+    username = body.get("username") if hasattr(body, "get") else None
+    return username.strip().lower() if isinstance(username, str) and username.strip() else None
+
+
+class RateLimit:
+    """
+    Route dependency, declared in `dependencies=[...]` so it runs before the
+    endpoint's own dependencies (database session, password hashing).
+    - per="ip": one window per client address.
+    - per="username": one window per username in the request body.
+    """
+
+    def __init__(self, scope: str, rate: str, per: str = "ip"):
+        if per not in ("ip", "username"):
+            raise ValueError(f"Unknown rate limit key: {per}")
+        self.scope = scope
+        self.rate = Rate.parse(rate)
+        self.per = per
+
+    async def __call__(self, request: Request, redis_client: aioredis.Redis | None = Depends(get_redis)):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        identity = client_ip(request) if self.per == "ip" else await request_username(request)
+        if identity is None:
+            return
+
+        decision = await hit(redis_client, f"ratelimit:{self.scope}:{self.per}:{identity}", self.rate)
+        if decision.allowed:
+            return
+
+        logger.warning("⚠️ Rate limit exceeded on %s for %s %s", self.scope, self.per, identity)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={
+                "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+                "X-RateLimit-Limit": str(self.rate.limit),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
@@ -0,0 +1,85 @@
+import logging
+import time
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.metrics import REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Shared client, created in the app lifespan; None while Redis is unavailable
+redis_client: aioredis.Redis | None = None
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started_at = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        except RedisError:
+            REDIS_COMMAND_ERRORS.labels("PIPELINE").inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - started_at)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """Records the latency of every command and pipeline round trip."""
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        started_at = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        except RedisError:
+            REDIS_COMMAND_ERRORS.labels(command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(time.perf_counter() - started_at)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def create_redis_client(command_timeout: float | None = None) -> aioredis.Redis:
+    """`command_timeout` overrides REDIS_COMMAND_TIMEOUT, e.g. for blocking queue reads."""
+    pool = aioredis.BlockingConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        max_connections=settings.REDIS_POOL_SIZE,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        socket_timeout=command_timeout or settings.REDIS_COMMAND_TIMEOUT,
+        decode_responses=True,
+    )
+    return InstrumentedRedis(connection_pool=pool)
+
+
+async def init_redis(command_timeout: float | None = None) -> aioredis.Redis | None:
+    global redis_client
+
+    client = create_redis_client(command_timeout)
+    try:
+        await client.ping()
+        logger.info("✅ Connected to Redis")
+    except RedisError:
+        logger.critical("🚨 Connection error to Redis! Make sure the Redis server is running.")
+        await client.aclose()
+        client = None  # Disable Redis so that the code can work without it
+
+    redis_client = client
+    return client
+
+
+async def close_redis():
+    global redis_client
+
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+
+
+def get_redis() -> aioredis.Redis | None:
+    return redis_client
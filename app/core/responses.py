@@ -0,0 +1,142 @@
+"""
+Response rendering for the API routers.
+- JSON is encoded with orjson.
+- MessagePack is sent when the client asks for it with `Accept: application/msgpack`
+  (msgpack is in requirements.txt; without it the API answers in JSON only).
+- Files are handed to the server by path or file descriptor when it supports
+  the ASGI pathsend / zerocopysend extensions, so it can sendfile() them.
+"""
+import os
+from contextvars import ContextVar
+from datetime import date, datetime
+
+import anyio
+import orjson
+from fastapi.responses import FileResponse, JSONResponse
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_media_type: ContextVar[str] = ContextVar("response_media_type", default=JSON_MEDIA_TYPE)
+
+
+def negotiate(accept: str | None) -> str:
+    """
+    The media type to answer with: MessagePack when the client prefers it over JSON, JSON otherwise.
+    Unknown or unsupported types never cause a 406, the API falls back to JSON.
+    """
+    if not accept or msgpack is None or "msgpack" not in accept:
+        return JSON_MEDIA_TYPE
+
+    best, best_q = JSON_MEDIA_TYPE, -1.0
+    for entry in accept.split(","):
+        media_type, _, params = entry.strip().partition(";")
+        media_type = media_type.strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES or media_type in (JSON_MEDIA_TYPE, "*/*", "application/*"):
+            q = 1.0
+            for param in params.split(";"):
+                name, _, value = param.strip().partition("=")
+                if name == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            # Ties go to the first listed type
+            if q > best_q:
+                best, best_q = media_type, q
+    if best in MSGPACK_MEDIA_TYPES and best_q > 0:
+        return best
+    return JSON_MEDIA_TYPE
+
+
+def negotiated_media_type() -> str:
+    """Media type picked for the current request by NegotiationMiddleware."""
+    return _media_type.get()
+
+
+def vary_headers() -> dict:
+    # Caches must keep JSON and MessagePack bodies of the same URL apart
+    return {"Vary": "Accept"} if msgpack is not None else {}
+
+
+class NegotiationMiddleware:
+    """Pure ASGI middleware: picks the response media type from `Accept` once per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        accept = None
+        for name, value in scope["headers"]:
+            if name == b"accept":
+                accept = value.decode("latin-1")
+                break
+        token = _media_type.set(negotiate(accept))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _media_type.reset(token)
+
+
+def _msgpack_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+class APIResponse(JSONResponse):
+    """
+    Default response class of the app: orjson, or MessagePack when negotiated.
+    Route handlers may return it directly with plain dicts (datetimes included)
+    to skip the response_model validation pass.
+    """
+
+    def __init__(self, content=None, status_code=200, headers=None, media_type=None, background=None):
+        super().__init__(content, status_code, headers, media_type or _media_type.get(), background)
+        for name, value in vary_headers().items():
+            self.headers.append(name, value)
+
+    def render(self, content) -> bytes:
+        if self.media_type in MSGPACK_MEDIA_TYPES:
+            return msgpack.packb(content, default=_msgpack_default)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that lets the server send the whole file itself:
+    `http.response.pathsend` (path) or `http.response.zerocopysend` (open file, sendfile()).
+    Servers without either extension (uvicorn) get the regular chunked reads.
+    Range and HEAD requests always take the regular path.
+    """
+
+    _extensions: dict = {}
+
+    async def __call__(self, scope, receive, send):
+        self._extensions = scope.get("extensions") or {}
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send, send_header_only: bool):
+        if send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+
+        if "http.response.pathsend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        elif "http.response.zerocopysend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopysend", "file": file, "more_body": False})
+            finally:
+                file.close()
+        else:
+            await super()._handle_simple(send, send_header_only)
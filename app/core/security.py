@@ -1,9 +1,20 @@
-from passlib.context import CryptContext
+import uuid
 from datetime import datetime, timedelta
 from jose import jwt
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.password_policy import PasswordPolicy, context_for, policy_from_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_policy = policy_from_settings()
+pwd_context = context_for(password_policy)
+
+
+def set_password_policy(policy: PasswordPolicy):
+    """Switches new hashes to `policy`; existing ones are upgraded on their next login."""
+    global password_policy, pwd_context
+
+    password_policy = policy
+    pwd_context = context_for(policy)
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -11,8 +22,20 @@ def hash_password(password: str):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str):
+    return await hashing_executor.run("hash", password, policy=password_policy)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await hashing_executor.run("verify", plain_password, hashed_password, policy=password_policy)
+
+async def verify_and_update_password_async(plain_password, hashed_password) -> tuple[bool, str | None]:
+    """Also returns a new hash when the stored one uses an outdated scheme or cost."""
+    return await hashing_executor.run("verify_and_update", plain_password, hashed_password, policy=password_policy)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    # Session id, revocation is checked by jti
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import STARTUP_DURATION
+from app.core.password_policy import PasswordPolicy, calibrate
+from app.core.redis_client import init_redis
+from app.core import security
+from app.models.base import Base, async_engine, engine
+# Registers the tables on Base.metadata for the "create" mode
+from app.models import job, sync_state, user  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_MODES = ("create", "check", "none")
+# Calibrated hashing parameters shared by all workers; delete the key to calibrate again
+PASSWORD_POLICY_KEY = "password_policy:{scheme}:{budget:g}"
+CALIBRATION_LOCK_TTL = 120
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+@dataclass
+class Readiness:
+    """
+    Startup state reported by /readyz.
+    - Required checks (database, schema) gate readiness.
+    - Optional ones (Redis) only mark the instance as degraded.
+    """
+
+    checks: dict[str, str] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+    import_seconds: float | None = None
+    startup_seconds: float | None = None
+    required: tuple[str, ...] = ("database",)
+
+    @property
+    def ready(self) -> bool:
+        return all(self.checks.get(name) == "ok" for name in self.required)
+
+    def as_dict(self) -> dict:
+        degraded = any(status != "ok" for status in self.checks.values())
+        return {
+            "status": "ready" if self.ready and not degraded else "degraded" if self.ready else "starting",
+            "checks": dict(self.checks),
+            "durations": {name: round(seconds, 4) for name, seconds in self.durations.items()},
+            "import_seconds": self.import_seconds,
+            "startup_seconds": self.startup_seconds,
+        }
+
+
+readiness = Readiness()
+
+
+async def timed_check(name: str, check, timeout: float | None = None):
+    """Runs one startup step with a timeout and records its outcome; never raises."""
+    timeout = timeout or settings.STARTUP_TIMEOUT
+    started_at = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(check(), timeout)
+        readiness.checks[name] = "ok"
+        return result
+    except asyncio.TimeoutError:
+        readiness.checks[name] = f"timed out after {timeout}s"
+    except Exception as e:
+        # SQLAlchemy errors carry the statement on the following lines
+        readiness.checks[name] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+    finally:
+        readiness.durations[name] = time.perf_counter() - started_at
+    logger.error("❌ Startup check %s failed: %s", name, readiness.checks[name])
+    return None
+
+
+def alembic_head() -> str | None:
+    # Imported lazily, only the "check" mode needs it
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    # alembic.ini points at a path relative to the repository root, not to the working directory
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _sync_check_database():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        if settings.SCHEMA_MODE == "create":
+            Base.metadata.create_all(bind=connection)
+            connection.commit()
+        elif settings.SCHEMA_MODE == "check":
+            _check_revision(connection)
+
+
+def _check_revision(connection):
+    current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    head = alembic_head()
+    if current != head:
+        raise RuntimeError(f"database is at revision {current}, expected {head}; run `alembic upgrade head`")
+
+
+async def check_database():
+    """Connects once (warming the pool) and applies SCHEMA_MODE: create tables, check the Alembic head, or nothing."""
+    if settings.SCHEMA_MODE not in SCHEMA_MODES:
+        raise ValueError(f"Unknown SCHEMA_MODE: {settings.SCHEMA_MODE}")
+
+    if async_engine is None:
+        await run_in_threadpool(_sync_check_database)
+        return
+
+    async with async_engine.begin() as connection:
+        await connection.execute(text("SELECT 1"))
+        if settings.SCHEMA_MODE == "create":
+            await connection.run_sync(Base.metadata.create_all)
+        elif settings.SCHEMA_MODE == "check":
+            await connection.run_sync(_check_revision)
+
+
+async def connect_redis():
+    client = await init_redis()
+    if client is None:
+        raise ConnectionError("Redis is unavailable, running without it")
+    return client
+
+
+async def calibrate_password_policy(redis_client):
+    """
+    Hashing cost that fits PASSWORD_HASH_BUDGET_MS (PASSWORD_CALIBRATE=true).
+    The first worker calibrates and stores the result in Redis; the others wait for it and use
+    the same parameters, so no two workers rehash each other's hashes back and forth.
+    Without Redis the configured cost is kept.
+    """
+    if redis_client is None:
+        raise ConnectionError("calibration is shared through Redis, using the configured cost")
+
+    policy = security.password_policy
+    key = PASSWORD_POLICY_KEY.format(scheme=policy.scheme, budget=settings.PASSWORD_HASH_BUDGET_MS)
+    stored = await redis_client.get(key)
+    if stored is None and await redis_client.set(f"{key}:lock", 1, nx=True, ex=CALIBRATION_LOCK_TTL):
+        try:
+            calibrated = await asyncio.to_thread(calibrate, policy, settings.PASSWORD_HASH_BUDGET_MS)
+            await redis_client.set(key, json.dumps(asdict(calibrated)), nx=True)
+            stored = await redis_client.get(key)
+        finally:
+            await redis_client.delete(f"{key}:lock")
+    while stored is None:
+        # Another worker is calibrating; the startup timeout bounds the wait
+        await asyncio.sleep(0.5)
+        stored = await redis_client.get(key)
+
+    policy = PasswordPolicy(**json.loads(stored))
+    security.set_password_policy(policy)
+    logger.info("✅ Password hashing calibrated to %.0f ms: %s", settings.PASSWORD_HASH_BUDGET_MS, policy)
+
+
+async def retry_database():
+    """Background task: keeps checking the database until the instance becomes ready."""
+    while not readiness.ready:
+        await asyncio.sleep(settings.STARTUP_RETRY_INTERVAL)
+        await timed_check("database", check_database)
+    logger.info("✅ Database is reachable, instance is ready")
+
+
+def record_startup(import_seconds: float, startup_seconds: float):
+    readiness.import_seconds = round(import_seconds, 4)
+    readiness.startup_seconds = round(startup_seconds, 4)
+    STARTUP_DURATION.labels("import").set(import_seconds)
+    STARTUP_DURATION.labels("startup").set(startup_seconds)
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedToken:
+    claims: dict
+    valid: bool
+    expires_at: float
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU/TTL cache of verified tokens.
+    - Keyed by the token hash, so raw tokens are never kept in memory.
+    - Entries live until the token's `exp` or the revalidation window, whichever comes first.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedToken] = OrderedDict()
+        self._by_user: dict[str, set[str]] = {}
+
+    def get(self, token: str) -> CachedToken | None:
+        key = hash_token(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, token: str, claims: dict, valid: bool):
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+
+        key = hash_token(token)
+        self._remove(key)
+        self._entries[key] = CachedToken(claims=claims, valid=valid, expires_at=expires_at)
+        self._by_user.setdefault(claims.get("sub"), set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, username: str):
+        for key in self._by_user.pop(username, set()):
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_user.clear()
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry.claims.get("sub"))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry.claims.get("sub")]
+
+
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
+async def publish_invalidation(redis_client: aioredis.Redis | None, username: str):
+    """Drops the user's cached tokens here and asks the other workers to do the same."""
+    token_cache.invalidate_user(username)
+    if redis_client is None:
+        return
+    try:
+        await redis_client.publish(settings.TOKEN_CACHE_CHANNEL, username)
+    except RedisError:
+        logger.error("⚠️ Error while publishing token invalidation to Redis")
+
+
+async def listen_for_invalidations(redis_client: aioredis.Redis):
+    """Background task: applies invalidations published by other workers."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(settings.TOKEN_CACHE_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        token_cache.invalidate_user(message["data"])
+        except RedisError:
+            # Entries may be stale while we are disconnected
+            token_cache.clear()
+            logger.error("⚠️ Token invalidation channel lost, reconnecting")
+            await asyncio.sleep(1)
@@ -0,0 +1,76 @@
+import time
+
+from redis import asyncio as aioredis
+
+# One small key per issued token, looked up by the token's `jti`:
+#   session:{jti}      -> username, expires with the token
+#   sessions:{username} -> sorted set of the user's jti, scored by expiry (unix time)
+
+SESSION_PREFIX = "session:"
+
+# Reads the user's sessions and deletes them in one step: a session saved meanwhile can't
+# end up in the set after its jti was read, surviving the revocation.
+# Returns the number of session keys removed.
+DELETE_SESSIONS_LUA = """
+local removed = 0
+for _, jti in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    removed = removed + redis.call('DEL', ARGV[1] .. jti)
+end
+redis.call('DEL', KEYS[1])
+return removed
+"""
+_delete_sessions_script = None
+
+
+def session_key(jti: str) -> str:
+    return f"{SESSION_PREFIX}{jti}"
+
+
+def user_sessions_key(username: str) -> str:
+    return f"sessions:{username}"
+
+
+async def save_session(redis_client: aioredis.Redis, username: str, jti: str, expires_at: int):
+    ttl = max(1, expires_at - int(time.time()))
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(session_key(jti), username, ex=ttl)
+        pipe.zadd(user_sessions_key(username), {jti: expires_at})
+        # Forget sessions that expired on their own
+        pipe.zremrangebyscore(user_sessions_key(username), "-inf", time.time())
+        # Tokens share one lifetime, so the newest session outlives the others
+        pipe.expire(user_sessions_key(username), ttl)
+        await pipe.execute()
+
+
+async def session_exists(redis_client: aioredis.Redis, jti: str) -> bool:
+    return bool(await redis_client.exists(session_key(jti)))
+
+
+async def delete_session(redis_client: aioredis.Redis, username: str, jti: str) -> bool:
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(session_key(jti))
+        pipe.zrem(user_sessions_key(username), jti)
+        deleted, _ = await pipe.execute()
+    return bool(deleted)
+
+
+async def list_sessions(redis_client: aioredis.Redis, username: str) -> list[tuple[str, int]]:
+    """Active sessions of the user as (jti, expires_at), newest first."""
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(user_sessions_key(username), "-inf", time.time())
+        pipe.zrevrange(user_sessions_key(username), 0, -1, withscores=True)
+        _, sessions = await pipe.execute()
+    return [(jti, int(expires_at)) for jti, expires_at in sessions]
+
+
+def _delete_sessions(redis_client: aioredis.Redis):
+    global _delete_sessions_script
+
+    if _delete_sessions_script is None or _delete_sessions_script.registered_client is not redis_client:
+        _delete_sessions_script = redis_client.register_script(DELETE_SESSIONS_LUA)
+    return _delete_sessions_script
+
+
+async def delete_sessions(redis_client: aioredis.Redis, username: str) -> int:
+    """Revokes every session of the user atomically, returns the number removed."""
+    return await _delete_sessions(redis_client)(keys=[user_sessions_key(username)], args=[SESSION_PREFIX])
@@ -1,6 +1,19 @@
+from datetime import datetime
+import html
+from sqlalchemy import Float, column, func, literal, literal_column, select, tuple_, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.job import Job
-from app.schemas.job import JobCreate, JobUpdate
+from app.models.base import AnySession, run_db
+from app.models.job import Job, SEARCH_CONFIG, moscow_now
+from app.schemas.job import JobCreate, JobSync, JobUpdate
+
+# Rows per INSERT statement, keeps bind parameters well below driver limits
+BULK_CHUNK_SIZE = 1000
+
+SNIPPET_START, SNIPPET_STOP = "<b>", "</b>"
+SNIPPET_OPTIONS = f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MaxWords=25, MinWords=8"
+
 
 def create_job(db: Session, job_data: JobCreate):
     db_job = Job(
@@ -12,29 +25,258 @@ def create_job(db: Session, job_data: JobCreate):
         description=job_data.description
     )
     db.add(db_job)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
     db.refresh(db_job)
     return db_job
 
+def _dialect_insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+def upsert_jobs(db: Session, jobs_data: list[JobCreate], commit: bool = True):
+    """
+    Inserts many jobs with INSERT ... ON CONFLICT (title) DO NOTHING.
+    Returns the inserted ids and the number of rows skipped as duplicates.
+    """
+    insert = _dialect_insert(db)
+    rows = [job_data.model_dump() for job_data in jobs_data]
+    ids = []
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        stmt = (
+            insert(Job)
+            .values(rows[start:start + BULK_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=[Job.title], index_where=Job.external_id.is_(None))
+            .returning(Job.id)
+        )
+        ids.extend(db.execute(stmt).scalars().all())
+    if commit:
+        db.commit()
+    return {"inserted": len(ids), "skipped": len(rows) - len(ids), "ids": ids}
+
+def sync_jobs(db: Session, jobs_data: list[JobSync], commit: bool = True):
+    """
+    Inserts or updates hh.ru vacancies by external id:
+    INSERT ... ON CONFLICT (external_id) DO UPDATE ... WHERE the content hash differs.
+    Unchanged vacancies are not written at all. Returns the ids of inserted and updated rows.
+    """
+    insert = _dialect_insert(db)
+    now = moscow_now()
+    # One row per external id: a statement may not update the same row twice
+    rows = list({
+        job_data.external_id: {**job_data.model_dump(), "created_at": now, "updated_at": now}
+        for job_data in jobs_data
+    }.values())
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    inserted, updated = [], []
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        stmt = insert(Job).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.external_id],
+            set_={
+                **{name: stmt.excluded[name] for name in JobSync.model_fields if name != "external_id"},
+                "updated_at": now,
+            },
+            where=Job.content_hash.is_distinct_from(stmt.excluded.content_hash),
+        )
+        if is_postgres:
+            # xmax is 0 only for row versions created by an INSERT
+            stmt = stmt.returning(Job.id, literal_column("xmax = 0").label("inserted"))
+            for job_id, is_new in db.execute(stmt):
+                (inserted if is_new else updated).append(job_id)
+        else:
+            existing = set(db.execute(
+                select(Job.id).where(Job.external_id.in_([row["external_id"] for row in chunk]))
+            ).scalars())
+            for job_id in db.execute(stmt.returning(Job.id)).scalars():
+                (updated if job_id in existing else inserted).append(job_id)
+    if commit:
+        db.commit()
+    return {
+        "inserted": len(inserted),
+        "updated": len(updated),
+        "unchanged": len(rows) - len(inserted) - len(updated),
+        "ids": inserted + updated,
+    }
+
 def get_job_by_title(db: Session, job_title: str):
-    return db.query(Job).filter(Job.title == job_title).first()
+    # Vacancies synced from hh.ru do not take part in title uniqueness
+    return db.query(Job).filter(Job.title == job_title, Job.external_id.is_(None)).first()
 
 def get_job_by_id(db: Session, job_id: str):
     return db.query(Job).filter(Job.id == job_id).first()
 
+def get_job_version(db: Session, job_id: int):
+    """(id, updated_at) only, answered from ix_jobs_id_updated_at."""
+    return db.execute(select(Job.id, Job.updated_at).where(Job.id == job_id)).first()
+
+def job_filters(status: str | None = None, company_name: str | None = None, company_address: str | None = None):
+    filters = []
+    if status is not None:
+        filters.append(Job.status == status)
+    if company_name is not None:
+        filters.append(Job.company_name == company_name)
+    if company_address is not None:
+        filters.append(Job.company_address == company_address)
+    return filters
+
+def list_jobs(
+        db: Session,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        **filters,
+):
+    """
+    Newest-first keyset page ordered by (created_at, id).
+    Fetches one extra row to tell whether a next page exists.
+    """
+    stmt = select(Job).where(*job_filters(**filters))
+    if after is not None:
+        stmt = stmt.where(tuple_(Job.created_at, Job.id) < tuple_(*after))
+    stmt = stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+
+    jobs = db.execute(stmt).scalars().all()
+    return jobs[:limit], len(jobs) > limit
+
+def search_jobs(
+        db: Session,
+        query: str,
+        limit: int,
+        after: tuple[float, int] | None = None,
+        **filters,
+):
+    """
+    Full-text search ranked by relevance, keyset-paginated on (rank, id).
+    Postgres uses the GIN-indexed `search_vector`; other databases fall back to a LIKE scan.
+    Returns (job, rank, snippet) rows and whether a next page exists.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return _search_jobs_like(db, query, limit, after, **filters)
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    search_vector = literal_column("jobs.search_vector")
+    rank = func.ts_rank(search_vector, ts_query).label("rank")
+
+    matches = select(Job.id, rank).where(search_vector.op("@@")(ts_query), *job_filters(**filters))
+    if after is not None:
+        matches = matches.where(tuple_(rank, Job.id) < tuple_(*after))
+    matches = matches.order_by(rank.desc(), Job.id.desc()).limit(limit + 1).subquery()
+
+    # Headlines are expensive, so they are built for the current page only
+    snippet = func.ts_headline(SEARCH_CONFIG, func.coalesce(Job.description, ""), ts_query, SNIPPET_OPTIONS)
+    stmt = (
+        select(Job, matches.c.rank, snippet)
+        .join(matches, matches.c.id == Job.id)
+        .order_by(matches.c.rank.desc(), Job.id.desc())
+    )
+    rows = db.execute(stmt).all()
+    return rows[:limit], len(rows) > limit
+
+def _search_jobs_like(db: Session, query: str, limit: int, after: tuple[float, int] | None, **filters):
+    needle = query.lower()
+    stmt = select(Job, literal(0.0, Float)).where(
+        func.lower(Job.title).contains(needle, autoescape=True)
+        | func.lower(Job.description).contains(needle, autoescape=True),
+        *job_filters(**filters),
+    )
+    if after is not None:
+        stmt = stmt.where(Job.id < after[1])
+    stmt = stmt.order_by(Job.id.desc()).limit(limit + 1)
+
+    rows = [(job, rank, _plain_snippet(job.description or "", needle)) for job, rank in db.execute(stmt).all()]
+    return rows[:limit], len(rows) > limit
+
+def _plain_snippet(text: str, needle: str, width: int = 80):
+    position = text.lower().find(needle)
+    if position < 0:
+        return html.escape(text[:width * 2])
+    start = max(0, position - width)
+    end = position + len(needle)
+    return (
+        html.escape(text[start:position])
+        + SNIPPET_START + html.escape(text[position:end]) + SNIPPET_STOP
+        + html.escape(text[end:end + width])
+    )
+
+# Columns returned by UPDATE ... RETURNING, the generated search vector is left out
+JOB_COLUMNS = tuple(Job.__table__.c)
+
+
+def update_values(job_data: JobUpdate) -> dict:
+    """Only the fields the client supplied; None means "leave unchanged"."""
+    return job_data.model_dump(exclude_unset=True, exclude_none=True)
+
+
 def update_job(db: Session, job_id: int, job_data: JobUpdate):
-    db.query(Job).filter(Job.id == job_id).update({
-        Job.title: job_data.title,
-        Job.status: job_data.status,
-        Job.company_name: job_data.company_name,
-        Job.company_address: job_data.company_address,
-        Job.logo_url: job_data.logo_url,
-        Job.description: job_data.description,
-    })
-    db.commit()
+    """
+    Partial update in a single UPDATE ... RETURNING statement.
+    Returns the updated row, or None when the vacancy does not exist.
+    """
+    statement = (
+        update(Job)
+        .where(Job.id == job_id)
+        .values(**update_values(job_data), updated_at=moscow_now())
+        .returning(*JOB_COLUMNS)
+    )
+    try:
+        row = db.execute(statement).first()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    return row
 
-    db_job = db.query(Job).filter(Job.id == job_id).first()
-    return db_job
+
+def update_jobs(db: Session, patches: dict[int, dict]):
+    """
+    Applies many partial updates in one transaction.
+    - Postgres: patches touching the same set of fields become one UPDATE ... FROM (VALUES ...) per chunk.
+    - Other databases: one UPDATE ... RETURNING per patch.
+    Returns the updated rows; ids missing from the result do not exist.
+    """
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for job_id, fields in patches.items():
+        groups.setdefault(tuple(sorted(fields)), []).append({"id": job_id, **fields})
+
+    now = moscow_now()
+    rows = []
+    try:
+        for names, group in groups.items():
+            if db.get_bind().dialect.name != "postgresql":
+                # SQLite cannot name the columns of a VALUES list: one UPDATE ... RETURNING per row
+                for item in group:
+                    statement = (
+                        update(Job)
+                        .where(Job.id == item["id"])
+                        .values({**{name: item[name] for name in names}, "updated_at": now})
+                        .returning(*JOB_COLUMNS)
+                    )
+                    rows.extend(db.execute(statement).all())
+                continue
+
+            for start in range(0, len(group), BULK_CHUNK_SIZE):
+                chunk = group[start:start + BULK_CHUNK_SIZE]
+                patch = values(
+                    *(column(name, Job.__table__.c[name].type) for name in ("id", *names)),
+                    name="patch",
+                ).data([tuple(item[name] for name in ("id", *names)) for item in chunk])
+                statement = (
+                    update(Job)
+                    .where(Job.id == patch.c.id)
+                    .values({**{name: patch.c[name] for name in names}, "updated_at": now})
+                    .returning(*JOB_COLUMNS)
+                )
+                rows.extend(db.execute(statement).all())
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    return rows
 
 def delete_job(db: Session, job_id: int):
     db_job = db.query(Job).filter(Job.id == job_id).first()
@@ -43,3 +285,37 @@ def delete_job(db: Session, job_id: int):
         db.commit()
         return db_job
     return None
+
+
+async def create_job_async(db: AnySession, job_data: JobCreate):
+    return await run_db(db, create_job, job_data)
+
+async def upsert_jobs_async(db: AnySession, jobs_data: list[JobCreate], commit: bool = True):
+    return await run_db(db, upsert_jobs, jobs_data, commit)
+
+async def sync_jobs_async(db: AnySession, jobs_data: list[JobSync], commit: bool = True):
+    return await run_db(db, sync_jobs, jobs_data, commit)
+
+async def get_job_by_title_async(db: AnySession, job_title: str):
+    return await run_db(db, get_job_by_title, job_title)
+
+async def get_job_by_id_async(db: AnySession, job_id: int):
+    return await run_db(db, get_job_by_id, job_id)
+
+async def get_job_version_async(db: AnySession, job_id: int):
+    return await run_db(db, get_job_version, job_id)
+
+async def list_jobs_async(db: AnySession, limit: int, after: tuple[datetime, int] | None = None, **filters):
+    return await run_db(db, list_jobs, limit, after, **filters)
+
+async def search_jobs_async(db: AnySession, query: str, limit: int, after: tuple[float, int] | None = None, **filters):
+    return await run_db(db, search_jobs, query, limit, after, **filters)
+
+async def update_job_async(db: AnySession, job_id: int, job_data: JobUpdate):
+    return await run_db(db, update_job, job_id, job_data)
+
+async def update_jobs_async(db: AnySession, patches: dict[int, dict]):
+    return await run_db(db, update_jobs, patches)
+
+async def delete_job_async(db: AnySession, job_id: int):
+    return await run_db(db, delete_job, job_id)
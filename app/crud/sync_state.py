@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.crud.job import _dialect_insert
+from app.models.base import AnySession, run_db
+from app.models.job import moscow_now
+from app.models.sync_state import SyncState
+
+def get_watermark(db: Session, key: str) -> datetime | None:
+    return db.query(SyncState.watermark).filter(SyncState.key == key).scalar()
+
+def set_watermark(db: Session, key: str, watermark: datetime):
+    now = moscow_now()
+    stmt = _dialect_insert(db)(SyncState).values(key=key, watermark=watermark, synced_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SyncState.key],
+        set_={"watermark": stmt.excluded.watermark, "synced_at": now},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+async def get_watermark_async(db: AnySession, key: str) -> datetime | None:
+    return await run_db(db, get_watermark, key)
+
+async def set_watermark_async(db: AnySession, key: str, watermark: datetime):
+    return await run_db(db, set_watermark, key, watermark)
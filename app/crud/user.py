@@ -1,15 +1,32 @@
 from sqlalchemy.orm import Session
+from app.models.base import AnySession, run_db
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import hash_password
+from app.core.security import hash_password, hash_password_async
 
 def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = hash_password(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None):
+    if hashed_password is None:
+        hashed_password = hash_password(user.password)
     db_user = User(username=user.username, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
+
+def update_password_hash(db: Session, username: str, hashed_password: str):
+    db.query(User).filter(User.username == username).update({User.hashed_password: hashed_password})
+    db.commit()
+
+
+async def get_user_by_username_async(db: AnySession, username: str):
+    return await run_db(db, get_user_by_username, username)
+
+async def create_user_async(db: AnySession, user: UserCreate):
+    hashed_password = await hash_password_async(user.password)
+    return await run_db(db, create_user, user, hashed_password)
+
+async def update_password_hash_async(db: AnySession, username: str, hashed_password: str):
+    return await run_db(db, update_password_hash, username, hashed_password)
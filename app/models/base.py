@@ -1,16 +1,108 @@
+from contextlib import asynccontextmanager
+from typing import Union
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import create_engine
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_collector
+
+# Sync driver -> async driver used by the async engine
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+AnySession = Union[AsyncSession, Session]
+
+
+def get_async_database_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        # Same pools as the defaults, with checkout timing for /metrics
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
 
-engine = create_engine(settings.DATABASE_URL)
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.DATABASE_ASYNC:
+    async_database_url = settings.DATABASE_ASYNC_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_database_url, **engine_options(async_database_url, is_async=True))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+pool_collector.add("sync", engine)
+if async_engine is not None:
+    pool_collector.add("async", async_engine.sync_engine)
+
 Base = declarative_base()
 
-def get_db():
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+@asynccontextmanager
+async def open_session(factory):
+    """Session from a sync or async sessionmaker; sync sessions are closed in the threadpool."""
+    if isinstance(factory, async_sessionmaker):
+        async with factory() as db:
+            yield db
+        return
+
+    db = factory()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_db():
+    """
+    Request-scoped session on the primary.
+    - AsyncSession on the async engine (default).
+    - Plain Session when DATABASE_ASYNC is disabled; CRUD calls then run in the threadpool.
+    """
+    async with open_session(AsyncSessionLocal or SessionLocal) as db:
+        yield db
+
+
+# Same session as the request dependency, for background work outside of requests
+session_scope = asynccontextmanager(get_db)
+
+
+async def run_db(db: AnySession, func, *args, **kwargs):
+    """Runs a sync CRUD function without blocking the event loop."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return await run_in_threadpool(func, db, *args, **kwargs)
+
+
+async def commit_db(db: AnySession):
+    await run_db(db, Session.commit)
+
+
+async def rollback_db(db: AnySession):
+    await run_db(db, Session.rollback)
@@ -1,16 +1,66 @@
 import pytz
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, DDL, event, text
 from app.models.base import Base
 from datetime import datetime
 
+MOSCOW_TZ = pytz.timezone('Europe/Moscow')
+
+# Postgres full-text search: generated `jobs.search_vector` column with a GIN index.
+# It is not mapped on the model so that the schema stays portable (SQLite falls back to LIKE).
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+
+def moscow_now():
+    # Naive Moscow time, the column stores timestamps without time zone
+    return datetime.now(MOSCOW_TZ).replace(tzinfo=None)
+
+
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally filtered by one column
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_jobs_company_name_created_at_id", "company_name", "created_at", "id"),
+        Index("ix_jobs_company_address_created_at_id", "company_address", "created_at", "id"),
+        # Conditional GETs read the version without touching the heap
+        Index("ix_jobs_id_updated_at", "id", "updated_at"),
+        # Titles are unique among vacancies created here; hh.ru vacancies are keyed by their own id
+        Index(
+            "ix_jobs_title", "title", unique=True,
+            postgresql_where=text("external_id IS NULL"), sqlite_where=text("external_id IS NULL"),
+        ),
+        Index("ix_jobs_external_id", "external_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
-    created_at = Column(DateTime, default=datetime.now(pytz.timezone('Europe/Moscow')), nullable=False)
+    title = Column(String)
+    created_at = Column(DateTime, default=moscow_now, nullable=False)
+    updated_at = Column(DateTime, default=moscow_now, onupdate=moscow_now, nullable=False)
     status = Column(String)
     company_name = Column(String)
     company_address = Column(String)
     logo_url = Column(String)
-    description = Column(String)
\ No newline at end of file
+    description = Column(String)
+    # hh.ru vacancy id, publication time and a hash of the stored fields; NULL for vacancies created here
+    external_id = Column(String)
+    published_at = Column(DateTime)
+    content_hash = Column(String)
+
+
+# Keeps `Base.metadata.create_all` in line with the Alembic migration on Postgres
+event.listen(
+    Job.__table__,
+    "after_create",
+    DDL(f"ALTER TABLE jobs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED")
+    .execute_if(dialect="postgresql"),
+)
+event.listen(
+    Job.__table__,
+    "after_create",
+    DDL("CREATE INDEX ix_jobs_search_vector ON jobs USING gin (search_vector)").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,198 @@
+"""
+Read replicas.
+- DATABASE_REPLICA_URLS lists the replicas; `get_read_db` spreads reads round-robin over the healthy ones.
+- A background check takes replicas that fail `SELECT 1` out of rotation and brings them back once they answer.
+- After a successful write request the client gets a short-lived cookie, and its reads go to the primary
+  until it expires, so it reads its own writes.
+Without replicas (or with none healthy) every read goes to the primary, exactly like `get_db`.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import DB_REPLICA_HEALTHY, pool_collector
+from app.models.base import (
+    AnySession,
+    AsyncSessionLocal,
+    SessionLocal,
+    engine_options,
+    get_async_database_url,
+    open_session,
+    session_scope,
+)
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass(eq=False)
+class Replica:
+    name: str
+    engine: object  # Engine, or AsyncEngine when DATABASE_ASYNC is enabled
+    session_factory: sessionmaker | async_sessionmaker
+    healthy: bool = True
+
+    async def ping(self):
+        if isinstance(self.session_factory, async_sessionmaker):
+            async with self.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        else:
+            await run_in_threadpool(self._sync_ping)
+
+    def _sync_ping(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+def create_replica(name: str, url: str) -> Replica:
+    # Sessions carry the replica name, so a miss can be told apart from a miss on the primary
+    if settings.DATABASE_ASYNC:
+        url = get_async_database_url(url)
+        replica_engine = create_async_engine(url, **engine_options(url, is_async=True))
+        factory = async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False, info={"replica": name})
+        pool_collector.add(name, replica_engine.sync_engine)
+    else:
+        replica_engine = create_engine(url, **engine_options(url))
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"replica": name})
+        pool_collector.add(name, replica_engine)
+    return Replica(name, replica_engine, factory)
+
+
+class ReplicaSet:
+    def __init__(self, replicas: list[Replica]):
+        self.replicas = replicas
+        self._counter = itertools.count()
+
+    def pick(self) -> Replica | None:
+        """Next healthy replica in round-robin order, None when reads should go to the primary."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self):
+        """Pings every replica concurrently; raises when none of them is usable."""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(replica.ping(), settings.DATABASE_REPLICA_CHECK_TIMEOUT) for replica in self.replicas),
+            return_exceptions=True,
+        )
+        for replica, result in zip(self.replicas, results):
+            healthy = not isinstance(result, BaseException)
+            if healthy and not replica.healthy:
+                logger.info("✅ Replica %s is back in rotation", replica.name)
+            elif not healthy and replica.healthy:
+                logger.warning("⚠️ Replica %s taken out of rotation: %s", replica.name, type(result).__name__)
+            replica.healthy = healthy
+            DB_REPLICA_HEALTHY.labels(replica.name).set(int(healthy))
+
+        if self.replicas and not any(replica.healthy for replica in self.replicas):
+            raise ConnectionError("no replica is reachable, reads go to the primary")
+
+    async def monitor(self):
+        """Background task: re-checks the replicas every DATABASE_REPLICA_CHECK_INTERVAL."""
+        while True:
+            await asyncio.sleep(settings.DATABASE_REPLICA_CHECK_INTERVAL)
+            try:
+                await self.check()
+            except ConnectionError:
+                pass
+
+    async def dispose(self):
+        for replica in self.replicas:
+            if isinstance(replica.session_factory, async_sessionmaker):
+                await replica.engine.dispose()
+            else:
+                await run_in_threadpool(replica.engine.dispose)
+
+
+replica_set = ReplicaSet([
+    create_replica(f"replica{index}", url.strip())
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS.split(","))
+    if url.strip()
+])
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_sessionmaker():
+    """Session factory for reads outside of a request (no read-your-writes guarantee)."""
+    replica = replica_set.pick()
+    if replica is not None:
+        return replica.session_factory
+    return AsyncSessionLocal or SessionLocal
+
+
+async def get_read_db(request: Request):
+    """
+    Request-scoped session for read-only endpoints.
+    - A healthy replica, round-robin.
+    - The primary when there are no replicas, none is healthy, or the client wrote recently.
+    """
+    replica = None if wrote_recently(request) else replica_set.pick()
+    factory = replica.session_factory if replica is not None else AsyncSessionLocal or SessionLocal
+    async with open_session(factory) as db:
+        yield db
+
+
+def is_replica(db: AnySession) -> bool:
+    return "replica" in db.info
+
+
+async def read_or_primary(db: AnySession, fetch, *args):
+    """
+    Runs an async CRUD lookup. A miss on a replica is re-checked on the primary:
+    the row may have been written a moment ago and not replicated yet.
+    """
+    result = await fetch(db, *args)
+    if result is None and is_replica(db):
+        async with session_scope() as primary:
+            result = await fetch(primary, *args)
+    return result
+
+
+async def read_primary(db: AnySession, fetch, *args):
+    """
+    Runs an async CRUD lookup on the primary: for reads whose result outlives the request
+    (shared caches) or is compared against what the client already has (conditional GETs),
+    where a lagging replica would serve or confirm an outdated row.
+    """
+    if not is_replica(db):
+        return await fetch(db, *args)
+    async with session_scope() as primary:
+        return await fetch(primary, *args)
+
+
+class StickyPrimaryMiddleware:
+    """Pure ASGI middleware: marks clients that just wrote, see DATABASE_STICKY_SECONDS."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                seconds = settings.DATABASE_STICKY_SECONDS
+                cookie = f"{STICKY_COOKIE}={time.time() + seconds:.0f}; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [*message.get("headers", ()), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
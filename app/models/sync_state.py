@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+from app.models.base import Base
+from app.models.job import moscow_now
+
+
+class SyncState(Base):
+    """Incremental sync progress, one row per source and search query."""
+    __tablename__ = "sync_state"
+
+    key = Column(String, primary_key=True)
+    # Newest publication time seen; the next sync asks only for vacancies published after it
+    watermark = Column(DateTime, nullable=False)
+    synced_at = Column(DateTime, default=moscow_now, onupdate=moscow_now, nullable=False)
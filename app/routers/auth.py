@@ -1,131 +1,234 @@
 import logging
-import redis
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+import time
+import uuid
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.base import AnySession, session_scope
 from app.models.user import User
-from app.core.security import verify_password, create_access_token
-from app.crud.user import get_user_by_username
-from app.schemas.user import UserCreate
+from app.models.replicas import get_read_db, read_or_primary
+from app.core.security import verify_and_update_password_async, create_access_token
+from app.crud.user import get_user_by_username_async, update_password_hash_async
+from app.schemas.user import UserCreate, SessionOut
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from redis.exceptions import RedisError
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from redis import asyncio as aioredis
 from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.core.redis_client import get_redis
+from app.core.token_store import save_session, session_exists, delete_session, delete_sessions, list_sessions
+from app.core.token_cache import token_cache, publish_invalidation
+from app.core.rate_limit import RateLimit
 
-# Settings
-SECRET_KEY = "your_secret_key"
-ACCESS_TOKEN_EXPIRE_MINUTES = 15
-
-# Connecting to Redis
-try:
-     redis_client = redis.Redis(
-        host=settings.REDIS_HOST,       # теперь берётся из .env или настроек
-        port=settings.REDIS_PORT,
-        db=settings.REDIS_DB,
-        decode_responses=True
-    )
-    redis_client.ping()
-    logging.info("✅ Connected to Redis")
-except RedisError:
-    logging.critical("🚨 Connection error to Redis! Make sure the Redis server is running.")
-    redis_client = None  # Disable Redis so that the code can work without it
-
-router = APIRouter()
-logging.basicConfig(level=logging.INFO)
+router = APIRouter(route_class=InstrumentedRoute)
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-@router.post("/token", summary="User authentication")
-async def login(user: UserCreate, db: Session = Depends(get_db)):
+async def store_rehashed_password(username: str, hashed_password: str):
+    # Runs after the response, so it uses its own session
+    try:
+        async with session_scope() as db:
+            await update_password_hash_async(db, username, hashed_password)
+        logger.info("✅ Password hash of user %s upgraded", username)
+    except SQLAlchemyError:
+        logger.exception("⚠️ Error while upgrading the password hash of user %s", username)
+
+
+@router.post(
+    "/token",
+    summary="User authentication",
+    dependencies=[
+        Depends(RateLimit("login", settings.RATE_LIMIT_LOGIN_IP, per="ip")),
+        Depends(RateLimit("login", settings.RATE_LIMIT_LOGIN_USERNAME, per="username")),
+    ],
+    responses={429: {"description": "Too many login attempts"}},
+)
+async def login(
+        user: UserCreate,
+        background_tasks: BackgroundTasks,
+        db: AnySession = Depends(get_read_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
     """
    **User authentication**
     - 🔑 Verifies login and password.
     - 🎫 Returns a JWT token for accessing protected APIs.
     - ❌ Error if the login or password is incorrect.
+    - ⏳ 429 with Retry-After when attempts per IP or per username exceed the limit.
+    - ♻️ Hashes with outdated parameters are upgraded in the background.
     """
-    logging.info(f"✅ Authentication request for user: {user.username}")
+    logger.info("✅ Authentication request for user: %s", user.username)
+
+    db_user = await read_or_primary(db, get_user_by_username_async, user.username)
 
-    db_user = get_user_by_username(db, user.username)
+    if not db_user:
+        logger.error("❌ Error: Invalid credentials!")
+        raise HTTPException(status_code=400, detail="Invalid username or password")
 
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
-        logging.error("❌ Error: Invalid credentials!")
+    valid, new_hash = await verify_and_update_password_async(user.password, db_user.hashed_password)
+    if not valid:
+        logger.error("❌ Error: Invalid credentials!")
         raise HTTPException(status_code=400, detail="Invalid username or password")
+    if new_hash is not None:
+        # Outdated hashing parameters: store the upgraded hash after the response is sent
+        background_tasks.add_task(store_rehashed_password, db_user.username, new_hash)
 
-    # Generate token with expiration time
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={"sub": db_user.username}, expires_delta=access_token_expires)
+    # Generate token with expiration time; every login is a separate session
+    # The JWT `exp` and the `session:{jti}` TTL come from the same setting
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    jti = uuid.uuid4().hex
+    access_token = create_access_token(data={"sub": db_user.username, "jti": jti}, expires_delta=access_token_expires)
 
-    # Save token in Redis if available
+    # Save session in Redis if available
     if redis_client:
         try:
-            redis_client.setex(f"token:{db_user.username}", ACCESS_TOKEN_EXPIRE_MINUTES * 60, access_token)
-            logging.info(f"✅ Token for user {db_user.username} saved in Redis")
+            expires_at = int(time.time() + access_token_expires.total_seconds())
+            await save_session(redis_client, db_user.username, jti, expires_at)
+            logger.info("✅ Session %s for user %s saved in Redis", jti, db_user.username)
         except RedisError:
-            logging.error("⚠️ Error while saving token in Redis")
+            logger.error("⚠️ Error while saving session in Redis")
 
-    logging.info(f"✅ Token issued to user: {db_user.username}")
+    logger.info("✅ Token issued to user: %s", db_user.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+
+async def get_current_session(
+        token: str = Depends(oauth2_scheme),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+) -> dict:
+    """
+    Validates the token and returns its claims.
+    - Revocation is a single EXISTS on `session:{jti}` (skipped while Redis is unavailable).
+    - Verified tokens are cached in-process for a short revalidation window.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        if not cached.valid:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return cached.claims
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        logger.error("❌ Error: Invalid token")
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_id = payload.get("sub")
+    jti = payload.get("jti")
+
+    # Verify session in Redis (if Redis is available)
+    if redis_client:
+        try:
+            active = jti is not None and await session_exists(redis_client, jti)
+        except RedisError:
+            logger.error("⚠️ Error while reading session from Redis")
+            raise HTTPException(status_code=503, detail="Token store unavailable")
+
+        if not active:
+            logger.error("❌ Session %s of user %s is not active", jti, user_id)
+            token_cache.set(token, payload, valid=False)
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+    token_cache.set(token, payload, valid=True)
+    return payload
+
+
 @router.get("/protected")
-async def protected_route(token: str = Depends(oauth2_scheme)):
+async def protected_route(claims: dict = Depends(get_current_session)):
     """
     **Protected route**
-    - Checks token in Redis.
+    - Checks the token session in Redis.
     - Returns a message if the token is valid.
     """
-    try:
-        # Decode token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("sub")
+    user_id = claims.get("sub")
+    logger.info("✅ Access granted for user %s", user_id)
+    return {"message": f"Hello, {user_id}! Your token is valid."}
 
-        # Verify token in Redis (if Redis is available)
-        if redis_client:
-            stored_token = redis_client.get(f"token:{user_id}")
-            if stored_token is None:
-                logging.error(f"❌ Token not found in Redis for user {user_id}")
-                raise HTTPException(status_code=401, detail="Invalid token")
-
-            if stored_token != token:
-                logging.error(f"❌ Token for user {user_id} does not match the one stored in Redis")
-                raise HTTPException(status_code=401, detail="Invalid token")
 
-        logging.info(f"✅ Access granted for user {user_id}")
-        return {"message": f"Hello, {user_id}! Your token is valid."}
+@router.get("/sessions", response_model=list[SessionOut], summary="Active sessions")
+async def list_user_sessions(
+        claims: dict = Depends(get_current_session),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Active sessions**
+    - 📱 Lists the sessions (logins) of the current user, newest first.
+    - 📍 `current` marks the session of the token used for this request.
+    """
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Token store unavailable")
+    try:
+        sessions = await list_sessions(redis_client, claims["sub"])
+    except RedisError:
+        logger.error("⚠️ Error while reading sessions from Redis")
+        raise HTTPException(status_code=503, detail="Token store unavailable")
 
-    except jwt.PyJWTError:
-        logging.error("❌ Error: Invalid token")
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return [
+        {"jti": jti, "expires_at": datetime.fromtimestamp(expires_at, timezone.utc), "current": jti == claims.get("jti")}
+        for jti, expires_at in sessions
+    ]
 
 
 @router.post("/logout")
-async def logout(token: str = Depends(oauth2_scheme)):
+async def logout(
+        token: str = Depends(oauth2_scheme),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
     """
     **Logout**
-    - Deletes the token from Redis.
-    - The user is logged out.
+    - Deletes the session of this token from Redis.
+    - Other sessions of the user stay active.
     """
     try:
         # Decode token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id = payload.get("sub")
+        jti = payload.get("jti")
+        token_cache.invalidate_user(user_id)
 
         if redis_client:
             try:
-                if redis_client.delete(f"token:{user_id}"):
-                    logging.info(f"✅ User {user_id} logged out, token deleted from Redis")
+                deleted = jti is not None and await delete_session(redis_client, user_id, jti)
+                await publish_invalidation(redis_client, user_id)
+                if deleted:
+                    logger.info("✅ User %s logged out, session %s deleted from Redis", user_id, jti)
                     return {"message": "You have successfully logged out"}
                 else:
-                    logging.warning(f"⚠️ Logout attempt: Token for user {user_id} is already missing in Redis")
+                    logger.warning("⚠️ Logout attempt: Session %s of user %s is already missing in Redis", jti, user_id)
                     return {"message": "Token is already invalid or missing"}
             except RedisError:
-                logging.error("⚠️ Error while deleting token from Redis")
+                logger.error("⚠️ Error while deleting session from Redis")
 
         return {"message": "You have logged out, but Redis is unavailable"}
 
     except jwt.ExpiredSignatureError:
-        logging.warning("⚠️ Logout attempt with an already expired token")
+        logger.warning("⚠️ Logout attempt with an already expired token")
         return {"message": "You have already logged out (token expired)"}
+
+
+@router.post("/logout/all")
+async def logout_all(
+        claims: dict = Depends(get_current_session),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Logout from all devices**
+    - 🚪 Revokes every session of the current user, including this one.
+    """
+    user_id = claims["sub"]
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Token store unavailable")
+    try:
+        revoked = await delete_sessions(redis_client, user_id)
+    except RedisError:
+        logger.error("⚠️ Error while deleting sessions from Redis")
+        raise HTTPException(status_code=503, detail="Token store unavailable")
+
+    await publish_invalidation(redis_client, user_id)
+    logger.info("✅ User %s logged out from %s sessions", user_id, revoked)
+    return {"message": "All sessions have been closed", "revoked": revoked}
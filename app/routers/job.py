@@ -1,14 +1,50 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Form, Query
-import requests
-from sqlalchemy.orm import Session
-from app.models.base import get_db
-from app.crud.job import create_job, update_job, get_job_by_title, delete_job,get_job_by_id
-from app.models.job import Job
-from app.schemas.job import JobCreate, JobUpdate, JobOut
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from app.models.base import AnySession, get_db
+from app.models.replicas import get_read_db, read_primary
+from app.crud.job import (
+    create_job_async,
+    update_job_async,
+    get_job_by_title_async,
+    delete_job_async,
+    get_job_by_id_async,
+    get_job_version_async,
+    update_jobs_async,
+    update_values,
+    upsert_jobs_async,
+    list_jobs_async,
+    search_jobs_async,
+)
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.schemas.job import JobCreate, JobUpdate, JobPatch, JobOut, JobBatchUpdateResult, JobBulkResult, JobPage, JobSearchPage, JobImportResult, ParseTaskOut, job_payload
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.core.rate_limit import RateLimit
+from app.core.responses import APIResponse, ZeroCopyFileResponse
+from app.core.redis_client import get_redis
+from app.core.http_cache import (
+    cache_headers,
+    collection_etag,
+    has_conditional_headers,
+    is_not_modified,
+    not_modified,
+    version_etag,
+)
+from app.services.export import MEDIA_TYPES, export_jobs
+from app.services.importer import import_jobs
+from app.services.job_cache import get_job_cached, get_stats, invalidate_jobs, refresh_job, refresh_jobs
+from app.services.hh import HH_MAX_DEPTH, get_http_client
+from app.services.logo_cache import LogoUnavailable, get_logo, thumbnails_available
+from app.services.tasks import enqueue_parse, get_task
 
-router = APIRouter()
-logging.basicConfig(level=logging.INFO)
+router = APIRouter(route_class=InstrumentedRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.post(
@@ -30,18 +66,19 @@ async def create_vacancy(
         company_address: str = Form(..., description="Company address"),
         logo_url: str = Form(..., description="Company logo"),
         description: str = Form(..., description="Job description"),
-        db: Session = Depends(get_db)
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
 ):
     """
     **Create a job vacancy**
     - ❌ Returns an error if a vacancy with the same title already exists.
     """
 
-    logging.info(f"✅ Attempting to create vacancy: {title}")
+    logger.info("✅ Attempting to create vacancy: %s", title)
 
     # Check if a vacancy with this title already exists
-    if get_job_by_title(db, title):
-        logging.warning(f"❌ Vacancy with title {title} already exists")
+    if await get_job_by_title_async(db, title):
+        logger.warning("❌ Vacancy with title %s already exists", title)
         raise HTTPException(status_code=400, detail="Vacancy already exists")
 
     # Create a JobCreate object before passing it to create_job
@@ -54,12 +91,77 @@ async def create_vacancy(
         description=description
     )
 
-    new_job = create_job(db, job_data)
-    logging.info(f"✅ Вакансия {title} successfully created")
+    try:
+        new_job = await create_job_async(db, job_data)
+    except IntegrityError:
+        # Created concurrently by another request
+        logger.warning("❌ Vacancy with title %s already exists", title)
+        raise HTTPException(status_code=400, detail="Vacancy already exists")
+    await invalidate_jobs(redis_client, [new_job.id])
+    logger.info("✅ Вакансия %s successfully created", title)
 
     return new_job
 
 
+@router.post(
+    "/bulk",
+    response_model=JobBulkResult,
+    summary="Create job vacancies in bulk",
+    description="""Inserts a JSON array of vacancies in batched INSERT ... ON CONFLICT statements.  
+    Vacancies whose title already exists are skipped.
+    """,
+)
+async def create_vacancies_bulk(
+        jobs: list[JobCreate],
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Create job vacancies in bulk**
+    - 📥 Inserts all new vacancies in one transaction.
+    - ⏭️ Skips vacancies that already exist.
+    - 🔢 Returns inserted/skipped counts and the ids of inserted rows.
+    """
+
+    logger.info("✅ Attempting to bulk create %s vacancies", len(jobs))
+
+    result = await upsert_jobs_async(db, jobs)
+    # Drops negative cache entries for ids that exist now
+    await invalidate_jobs(redis_client, result["ids"])
+    logger.info("✅ Vacancies inserted: %s, skipped: %s", result['inserted'], result['skipped'])
+
+    return result
+
+
+@router.post(
+    "/import",
+    response_model=JobImportResult,
+    summary="Import job vacancies",
+    description="""Loads a streamed NDJSON or CSV upload (raw request body) in one transaction.  
+    Vacancies whose title already exists are skipped; invalid rows are reported by row number.
+    """,
+)
+async def import_vacancies(
+        request: Request,
+        format: Literal["ndjson", "csv"] = Query("ndjson", description="Upload format"),
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Import job vacancies**
+    - 📥 Rows are validated in chunks while the upload is still streaming.
+    - 🚀 On Postgres, rows are loaded with COPY into a staging table and merged in one statement.
+    - 📝 Returns a per-row error report.
+    """
+
+    logger.info("✅ Importing vacancies from %s upload", format)
+
+    result = await import_jobs(db, request.stream(), format)
+    await invalidate_jobs(redis_client, result.ids)
+
+    return result
+
+
 @router.put(
     "/update/{job_id}",
     response_model=JobOut,
@@ -74,19 +176,15 @@ async def update_vacancy(
     company_address: str = Form(..., description="Company address"),
     logo_url: str = Form(..., description="Company logo"),
     description: str = Form(..., description="Job description"),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_db),
+    redis_client: aioredis.Redis | None = Depends(get_redis),
 ):
     """
     **Update a job vacancy**
     - 🔄 Updates job vacancy information.
     """
 
-    logging.info(f"✅ Attempting to update vacancy with ID: {job_id}")
-
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        logging.warning(f"❌ Vacancy with ID {job_id} not found")
-        raise HTTPException(status_code=404, detail="Vacancy not found")
+    logger.info("✅ Attempting to update vacancy with ID: %s", job_id)
 
     job_data = JobUpdate(
         title=title,
@@ -97,12 +195,95 @@ async def update_vacancy(
         description=description
     )
 
-    updated_job = update_job(db, job_id, job_data)
-    logging.info(f"✅ Vacancy with ID {job_id} successfully updated")
+    return await _apply_update(db, redis_client, job_id, job_data)
+
+
+async def _apply_update(db: AnySession, redis_client: aioredis.Redis | None, job_id: int, job_data: JobUpdate):
+    try:
+        updated_job = await update_job_async(db, job_id, job_data)
+    except IntegrityError:
+        logger.error("❌ Error: Vacancy with title %s already exists", job_data.title)
+        raise HTTPException(status_code=400, detail="A job with this title already exists")
 
+    if updated_job is None:
+        logger.warning("❌ Vacancy with ID %s not found", job_id)
+        raise HTTPException(status_code=404, detail="Vacancy not found")
+
+    await refresh_job(redis_client, updated_job)
+    logger.info("✅ Vacancy with ID %s successfully updated", job_id)
     return updated_job
 
 
+# Declared before PATCH /{job_id}, so that "batch" is not taken for a job id
+@router.patch(
+    "/batch",
+    response_model=JobBatchUpdateResult,
+    summary="Update many job vacancies",
+    description="Applies partial updates to many vacancies in one transaction",
+)
+async def patch_vacancies_batch(
+        patches: list[JobPatch],
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Update many job vacancies**
+    - ✏️ Each item has an `id` and only the fields to change.
+    - 🔒 All or nothing: a duplicate title rolls back the whole batch.
+    - 🔎 Unknown ids are reported in `not_found`.
+    """
+
+    # A later patch for the same id wins field by field
+    merged: dict[int, dict] = {}
+    for patch in patches:
+        fields = update_values(patch)
+        fields.pop("id")
+        if not fields:
+            raise HTTPException(status_code=400, detail=f"Patch for vacancy {patch.id} has no fields to update")
+        merged.setdefault(patch.id, {}).update(fields)
+
+    logger.info("✅ Updating %s vacancies in one batch", len(merged))
+
+    try:
+        rows = await update_jobs_async(db, merged)
+    except IntegrityError:
+        logger.error("❌ Error: Batch update would duplicate a vacancy title")
+        raise HTTPException(status_code=400, detail="A job with this title already exists")
+
+    await refresh_jobs(redis_client, rows)
+    updated_ids = {row.id for row in rows}
+    return {
+        "updated": len(updated_ids),
+        "ids": sorted(updated_ids),
+        "not_found": [job_id for job_id in merged if job_id not in updated_ids],
+    }
+
+
+@router.patch(
+    "/{job_id}",
+    response_model=JobOut,
+    summary="Partially update a job vacancy",
+    description="Updates only the supplied fields in a single statement",
+)
+async def patch_vacancy(
+        job_id: int,
+        job_data: JobUpdate,
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Partially update a job vacancy**
+    - ✏️ Send only the fields to change, as JSON.
+    - ⚡ One UPDATE ... RETURNING, no separate existence check.
+    """
+
+    if not update_values(job_data):
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    logger.info("✅ Attempting to patch vacancy with ID: %s", job_id)
+    return await _apply_update(db, redis_client, job_id, job_data)
+
+
 @router.get(
     "/get/{job_id}",
     response_model=JobOut,
@@ -111,21 +292,216 @@ async def update_vacancy(
 )
 async def get_vacancy(
         job_id: int,
-        db: Session = Depends(get_db)
+        request: Request,
+        db: AnySession = Depends(get_read_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
 ):
     """
     **Get a job vacancy**
     - 📄 Retrieves job vacancy information by its ID.
+    - ⚡ Served from the Redis cache when possible, without re-validating the cached payload.
+    - 🏷️ Returns ETag/Last-Modified and answers conditional requests with 304.
     """
 
-    logging.info(f"✅ Attempting to retrieve vacancy with ID: {job_id}")
+    logger.info("✅ Attempting to retrieve vacancy with ID: %s", job_id)
 
-    job = get_job_by_id(db, job_id)
+    if has_conditional_headers(request):
+        # A replica could confirm a version that was just replaced
+        version = await read_primary(db, get_job_version_async, job_id)
+        if version is not None:
+            etag = version_etag(version.id, version.updated_at)
+            if is_not_modified(request, etag, version.updated_at):
+                return not_modified(etag, version.updated_at)
+
+    job = await get_job_cached(db, redis_client, job_id)
     if not job:
-        logging.warning(f"❌ Vacancy with ID {job_id} not found")
+        logger.warning("❌ Vacancy with ID %s not found", job_id)
         raise HTTPException(status_code=404, detail="Vacancy not found")
 
-    return job
+    updated_at = datetime.fromisoformat(job["updated_at"])
+    return APIResponse(job, headers=cache_headers(version_etag(job["id"], updated_at), updated_at))
+
+
+@router.get(
+    "/{job_id}/logo",
+    summary="Get a vacancy logo",
+    description="Serves the company logo of a vacancy, or a thumbnail of it, from the local logo cache",
+    response_class=ZeroCopyFileResponse,
+    responses={502: {"description": "The logo could not be downloaded"}},
+)
+async def get_vacancy_logo(
+        job_id: int,
+        request: Request,
+        size: Optional[int] = Query(None, description="Thumbnail size in px, one of LOGO_THUMBNAIL_SIZES"),
+        db: AnySession = Depends(get_read_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Get a vacancy logo**
+    - 🖼️ Downloaded once, then served from disk; identical images are stored once.
+    - 📐 `size` selects a pre-resized WebP thumbnail.
+    - 🏷️ ETag is the image digest; answers conditional requests with 304.
+    """
+
+    if size is not None and size not in settings.LOGO_THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"size must be one of {settings.LOGO_THUMBNAIL_SIZES}")
+    if size is not None and not thumbnails_available():
+        raise HTTPException(status_code=400, detail="Thumbnails are not available, install Pillow")
+
+    job = await get_job_cached(db, redis_client, job_id)
+    if not job:
+        logger.warning("❌ Vacancy with ID %s not found", job_id)
+        raise HTTPException(status_code=404, detail="Vacancy not found")
+    if not job["logo_url"]:
+        raise HTTPException(status_code=404, detail="Vacancy has no logo")
+
+    try:
+        logo = await get_logo(await get_http_client(), job["logo_url"], size)
+    except LogoUnavailable as e:
+        logger.warning("⚠️ Logo of vacancy %s is unavailable: %s", job_id, e)
+        raise HTTPException(status_code=502, detail="Logo is unavailable")
+
+    etag = f'"{logo.digest}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.LOGO_MAX_AGE}"}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+    return ZeroCopyFileResponse(logo.path, media_type=logo.media_type, headers=headers)
+
+
+@router.get(
+    "/list",
+    response_model=JobPage,
+    summary="List job vacancies",
+    description="Returns vacancies newest first, paginated with an opaque cursor",
+)
+async def list_vacancies(
+        request: Request,
+        limit: int = Query(20, ge=1, le=100, description="Page size"),
+        cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+        status: Optional[str] = Query(None, description="Vacancy status"),
+        company_name: Optional[str] = Query(None, description="Company name"),
+        company_address: Optional[str] = Query(None, description="Company address"),
+        db: AnySession = Depends(get_read_db)
+):
+    """
+    **List job vacancies**
+    - 📄 Keyset pagination on (created_at, id): every page costs the same, however deep.
+    - 🔍 Optional filters by status, company name and company address.
+    - 🏷️ Returns an ETag of the page and answers conditional requests with 304.
+    """
+
+    after = None
+    if cursor is not None:
+        try:
+            created_at, job_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(created_at), int(job_id))
+        except (InvalidCursor, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    jobs, has_more = await list_jobs_async(
+        db,
+        limit,
+        after,
+        status=status,
+        company_name=company_name,
+        company_address=company_address,
+    )
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(jobs[-1].created_at.isoformat(), jobs[-1].id)
+
+    etag = collection_etag([(job.id, job.updated_at) for job in jobs], next_cursor)
+    last_modified = max((job.updated_at for job in jobs), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    # Rows go out as they are: response_model only documents the shape
+    return APIResponse(
+        {"items": [job_payload(job) for job in jobs], "next_cursor": next_cursor},
+        headers=cache_headers(etag, last_modified),
+    )
+
+
+@router.get(
+    "/search",
+    response_model=JobSearchPage,
+    summary="Search job vacancies",
+    description="Full-text search over vacancy titles and descriptions, best matches first",
+)
+async def search_vacancies(
+        q: str = Query(..., min_length=1, description="Search query (web search syntax)"),
+        limit: int = Query(20, ge=1, le=100, description="Page size"),
+        cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+        status: Optional[str] = Query(None, description="Vacancy status"),
+        company_name: Optional[str] = Query(None, description="Company name"),
+        company_address: Optional[str] = Query(None, description="Company address"),
+        db: AnySession = Depends(get_read_db)
+):
+    """
+    **Search job vacancies**
+    - 🔍 Ranked with `ts_rank`, title matches weigh more than description matches.
+    - ✨ Each hit carries a highlighted description snippet.
+    - 📄 Same cursor pagination and filters as listing.
+    """
+
+    after = None
+    if cursor is not None:
+        try:
+            rank, job_id = decode_cursor(cursor, 2)
+            after = (float(rank), int(job_id))
+        except (InvalidCursor, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows, has_more = await search_jobs_async(
+        db,
+        q,
+        limit,
+        after,
+        status=status,
+        company_name=company_name,
+        company_address=company_address,
+    )
+
+    items = [
+        {**job_payload(job), "rank": rank, "snippet": snippet}
+        for job, rank, snippet in rows
+    ]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(items[-1]["rank"], items[-1]["id"])
+
+    return APIResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get(
+    "/export",
+    summary="Export job vacancies",
+    description="Streams all vacancies matching the listing filters as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_vacancies(
+        format: Literal["ndjson", "csv"] = Query("ndjson", description="Export format"),
+        compress: bool = Query(False, description="Gzip the exported file"),
+        status: Optional[str] = Query(None, description="Vacancy status"),
+        company_name: Optional[str] = Query(None, description="Company name"),
+        company_address: Optional[str] = Query(None, description="Company address"),
+):
+    """
+    **Export job vacancies**
+    - 📦 Rows are read through a server-side cursor and written as they arrive.
+    - 🧠 Memory use stays flat regardless of table size.
+    - 🗜️ Optional on-the-fly gzip compression.
+    """
+
+    logger.info("✅ Exporting vacancies as %s", format)
+
+    filename = f"vacancies.{format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        export_jobs(format, compress, status=status, company_name=company_name, company_address=company_address),
+        media_type="application/gzip" if compress else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.delete(
@@ -135,79 +511,91 @@ async def get_vacancy(
 )
 async def delete_vacancy(
         job_id: int,
-        db: Session = Depends(get_db)
+        db: AnySession = Depends(get_db),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
 ):
     """
     **Delete a job vacancy**
     - ❌ Deletes a job vacancy by ID.
     """
 
-    logging.info(f"✅ Attempting to delete vacancy with ID: {job_id}")
+    logger.info("✅ Attempting to delete vacancy with ID: %s", job_id)
 
-    job = get_job_by_id(db, job_id)
+    job = await get_job_by_id_async(db, job_id)
     if not job:
-        logging.warning(f"❌ Vacancy with ID {job_id} not found")
+        logger.warning("❌ Vacancy with ID %s not found", job_id)
         raise HTTPException(status_code=404, detail="Vacancy not found")
 
-    delete_job(db, job_id)
-    logging.info(f"✅ Vacancy with ID {job_id} successfully deleted")
+    await delete_job_async(db, job_id)
+    await invalidate_jobs(redis_client, [job_id])
+    logger.info("✅ Vacancy with ID %s successfully deleted", job_id)
 
     return {"message": "Vacancy successfully deleted"}
 
 
 
-@router.post("/parse")
+@router.get("/cache/stats", summary="Vacancy cache statistics")
+async def vacancy_cache_stats():
+    """
+    **Vacancy cache statistics**
+    - 📊 Hit and miss counters of this worker's read-through cache.
+    """
+    return get_stats()
+
+
+@router.post(
+    "/parse",
+    response_model=ParseTaskOut,
+    status_code=202,
+    summary="Parse job vacancies from hh.ru",
+    description="Queues a background task that fetches vacancies from hh.ru, stores new ones and updates changed ones",
+    dependencies=[Depends(RateLimit("parse", settings.RATE_LIMIT_PARSE_IP))],
+)
 async def parse_vacancies(
         search_query: str = Query(..., description="Search query"),
-        count: int = Query(10, description="Number of vacancies to fetch"),
-        db: Session = Depends(get_db)
+        count: int = Query(10, ge=1, le=HH_MAX_DEPTH, description="Number of vacancies to fetch"),
+        sync: bool = Query(False, description="Fetch only vacancies published since the previous sync of this query"),
+        redis_client: aioredis.Redis | None = Depends(get_redis),
 ):
     """
     **Parse job vacancies from hh.ru**
-    - 🔍 Retrieves vacancies based on the given search query.
-    - 📥 Saves them to the database if they do not already exist.
+    - 🔍 Retrieves vacancies based on the given search query in the background.
+    - 🎫 Returns a task id; poll `GET /parse/{task_id}` for progress.
+    - ♻️ An identical query that is still running returns the existing task.
+    - 🔄 `sync=true` fetches only what was published since the last sync; unchanged vacancies are not rewritten.
     """
 
-    hh_api_url = "https://api.hh.ru/vacancies"
-
-    params = {"text": search_query, "per_page": count}
-    response = requests.get(hh_api_url, params=params)
-
-    if response.status_code != 200:
-        logging.error("❌ API request to hh.ru failed")
-        raise HTTPException(status_code=500, detail="Failed to fetch data from hh.ru")
+    try:
+        task, deduplicated = await enqueue_parse(redis_client, search_query, count, sync)
+    except RedisError:
+        logger.error("⚠️ Error while queueing parse task in Redis")
+        raise HTTPException(status_code=503, detail="Task queue unavailable")
 
-    logging.info(f"✅ API request to hh.ru {hh_api_url} was successful")
-    vacancies = response.json().get("items", [])
+    logger.info("✅ Parse task %s queued for: %s (deduplicated: %s)", task['task_id'], search_query, deduplicated)
+    return {**task, "deduplicated": deduplicated}
 
-    added_count = 0
-    for vacancy in vacancies:
-        if not isinstance(vacancy, dict):
-            continue
 
-        employer = vacancy.get("employer")
-        address = vacancy.get("address")
-
-        title = vacancy.get("name", "Not specified")
-        logo_url = employer["logo_urls"]["original"] if employer and employer.get("logo_urls") else ""
-        company_name = employer["name"] if employer and employer.get("name") else "Not specified"
-        company_address = address["city"] if address and address.get("city") else "Not specified"
-        description = vacancy.get("description", "Description not available")
-        status = vacancy["schedule"]["name"] if vacancy.get("schedule") and vacancy["schedule"].get("name") else "Not specified"
-
-        if get_job_by_title(db, title):
-            continue
+@router.get(
+    "/parse/{task_id}",
+    response_model=ParseTaskOut,
+    summary="Get parse task status",
+    description="Reports progress, added, updated and unchanged counts and errors of a parse task",
+)
+async def get_parse_task(
+        task_id: str,
+        redis_client: aioredis.Redis | None = Depends(get_redis),
+):
+    """
+    **Get parse task status**
+    - 📊 Status is one of queued, running, completed, failed.
+    """
 
-        job_data = JobCreate(
-            title=title,
-            status=status,
-            company_name=company_name,
-            company_address=company_address,
-            logo_url=logo_url,
-            description=description
-        )
-        create_job(db, job_data)
-        added_count += 1
+    try:
+        task = await get_task(redis_client, task_id)
+    except RedisError:
+        logger.error("⚠️ Error while reading parse task from Redis")
+        raise HTTPException(status_code=503, detail="Task queue unavailable")
 
-    logging.info(f"✅ Vacancies added: {added_count}")
-    return {"message": "Parsing completed", "added": added_count}
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
@@ -1,12 +1,14 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
-from app.models.base import get_db
-from app.crud.user import create_user, get_user_by_username
+from app.models.base import AnySession, get_db
+from app.crud.user import create_user_async, get_user_by_username_async
 from app.schemas.user import UserCreate, UserOut
+from app.core.config import settings
+from app.core.metrics import InstrumentedRoute
+from app.core.rate_limit import RateLimit
 
-router = APIRouter()
-logging.basicConfig(level=logging.INFO)
+router = APIRouter(route_class=InstrumentedRoute)
+logger = logging.getLogger(__name__)
 
 @router.post(
     "/register",
@@ -19,13 +21,15 @@ logging.basicConfig(level=logging.INFO)
     """,
     responses={
         201: {"description": "User successfully registered"},
-        400: {"description": "User already exists"}
+        400: {"description": "User already exists"},
+        429: {"description": "Too many registrations from this address"},
     },
+    dependencies=[Depends(RateLimit("register", settings.RATE_LIMIT_REGISTER_IP))],
 )
 async def register(
         username: str = Form(..., description="Username"),
         password: str = Form(..., description="Password"),
-        db: Session = Depends(get_db)
+        db: AnySession = Depends(get_db)
 ):
     """
     **User Registration**
@@ -34,15 +38,15 @@ async def register(
     - 🔒 The password is stored in an encrypted format.
     """
 
-    logging.info(f"✅ Attempting to register user: {username}")
+    logger.info("✅ Attempting to register user: %s", username)
 
-    if get_user_by_username(db, username):
-        logging.warning(f"❌ Registration failed: user {username} already exists")
+    if await get_user_by_username_async(db, username):
+        logger.warning("❌ Registration failed: user %s already exists", username)
         raise HTTPException(status_code=400, detail="User already exists")
 
     # 🔥 Create a UserCreate object before passing it to create_user
     user_data = UserCreate(username=username, password=password)
-    new_user = create_user(db, user_data)
-    logging.info(f"✅ User {username} successfully registered")
+    new_user = await create_user_async(db, user_data)
+    logger.info("✅ User %s successfully registered", username)
 
     return new_user
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
@@ -23,14 +24,93 @@ class JobUpdate(BaseModel):
     class Config:
         from_attributes = True
 
+class JobSync(JobCreate):
+    """A vacancy from hh.ru, keyed by its hh.ru id."""
+    external_id: str
+    published_at: Optional[datetime] = None
+    content_hash: str
+
+
+class JobPatch(JobUpdate):
+    id: int
+
+
+class JobBatchUpdateResult(BaseModel):
+    updated: int
+    ids: list[int]
+    not_found: list[int]
+
+
 class JobOut(BaseModel):
     id: int
+    created_at: datetime
+    updated_at: datetime
     title: str
     status: str
     company_name: str
     company_address: str
     logo_url: str
     description: str
+    external_id: Optional[str] = None
+    published_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+JOB_OUT_FIELDS = tuple(JobOut.model_fields)
+
+
+def job_payload(job) -> dict:
+    """JobOut as a plain dict, read straight off an ORM object or row without a validation pass."""
+    return {name: getattr(job, name) for name in JOB_OUT_FIELDS}
+
+
+class JobBulkResult(BaseModel):
+    inserted: int
+    skipped: int
+    ids: list[int]
+
+
+class JobPage(BaseModel):
+    items: list[JobOut]
+    next_cursor: Optional[str] = None
+
+
+class JobImportError(BaseModel):
+    row: int
+    errors: list[dict]
+
+
+class JobImportResult(BaseModel):
+    rows: int
+    inserted: int
+    skipped: int
+    failed: int
+    errors: list[JobImportError]
+
+
+class JobSearchHit(JobOut):
+    rank: float
+    snippet: str
+
+
+class JobSearchPage(BaseModel):
+    items: list[JobSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ParseTaskOut(BaseModel):
+    task_id: str
+    status: str
+    search_query: str
+    count: int
+    sync: bool = False
+    added: int
+    updated: int = 0
+    skipped: int
+    pages: int
+    errors: list[str]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    deduplicated: bool = False
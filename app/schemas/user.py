@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 
 class UserCreate(BaseModel):
@@ -10,3 +11,9 @@ class UserOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SessionOut(BaseModel):
+    jti: str
+    expires_at: datetime
+    current: bool = False
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.concurrency import iterate_in_threadpool
+
+from app.crud.job import job_filters
+from app.models.job import Job
+from app.models.replicas import read_sessionmaker
+from app.schemas.job import JobOut
+
+EXPORT_FIELDS = list(JobOut.model_fields)
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_query(**filters):
+    # Plain columns instead of ORM entities: rows are not kept in the identity map
+    columns = [getattr(Job, field) for field in EXPORT_FIELDS]
+    return (
+        select(*columns)
+        .where(*job_filters(**filters))
+        .order_by(Job.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _sync_batches(factory, stmt) -> Iterator[list]:
+    with factory() as db:
+        yield from db.execute(stmt).partitions()
+
+
+async def stream_job_batches(**filters) -> AsyncIterator[list]:
+    """
+    Yields batches of job rows through a server-side cursor.
+    Opens its own session: request-scoped sessions are closed before a streamed body is sent.
+    """
+    stmt = _export_query(**filters)
+    # Exports are the heaviest reads there are: served by a replica when there is one
+    factory = read_sessionmaker()
+    if not isinstance(factory, async_sessionmaker):
+        async for batch in iterate_in_threadpool(_sync_batches(factory, stmt)):
+            yield batch
+        return
+
+    async with factory() as db:
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            yield batch
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson(rows: list) -> bytes:
+    return "".join(
+        json.dumps(dict(row._mapping), default=_isoformat, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _csv(rows: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_isoformat(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_jobs(export_format: str, compress: bool = False, **filters) -> AsyncIterator[bytes]:
+    """Serializes jobs batch by batch, optionally gzip-compressed on the fly."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    if export_format == "csv":
+        chunk = _csv([], header=True)
+        yield compressor.compress(chunk) if compressor else chunk
+
+    async for rows in stream_job_batches(**filters):
+        chunk = _csv(rows, header=False) if export_format == "csv" else _ndjson(rows)
+        if compressor is None:
+            yield chunk
+            continue
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import HH_FETCH_DURATION, HH_FETCH_RETRIES
+from app.crud.job import sync_jobs_async
+from app.crud.sync_state import get_watermark_async, set_watermark_async
+from app.models.base import AnySession
+from app.models.job import MOSCOW_TZ
+from app.schemas.job import JobCreate, JobSync
+from app.services.logo_cache import prefetch_logos
+
+logger = logging.getLogger(__name__)
+
+HH_MAX_PER_PAGE = 100
+HH_MAX_DEPTH = 2000  # hh.ru never returns more than 2000 items for one search
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HH_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Shared client, created in the app lifespan
+http_client: httpx.AsyncClient | None = None
+
+
+class HHFetchError(Exception):
+    pass
+
+
+@dataclass
+class IngestResult:
+    added: int = 0
+    updated: int = 0
+    skipped: int = 0
+    pages: int = 0
+    found: int = 0
+    # Newest publication time among the fetched vacancies
+    watermark: datetime | None = None
+    ids: list[int] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """`transport` lets tests and benchmarks point the client at a local stub of the hh.ru API."""
+    return httpx.AsyncClient(
+        base_url=settings.HH_API_URL,
+        headers={"User-Agent": settings.HH_USER_AGENT},
+        timeout=settings.HH_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.HH_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HH_MAX_CONNECTIONS,
+        ),
+        transport=transport,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    global http_client
+
+    if http_client is None:
+        # Building the SSL context takes a noticeable moment, keep it off the event loop
+        http_client = await asyncio.to_thread(create_http_client)
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    return http_client or await init_http_client()
+
+
+async def fetch_page(
+        client: httpx.AsyncClient,
+        search_query: str,
+        page: int,
+        per_page: int,
+        since: datetime | None = None,
+        newest_first: bool = False,
+) -> dict:
+    """
+    Fetches one result page, retrying transport errors and 429/5xx with exponential backoff.
+    With `since`, only vacancies published after it are requested.
+    """
+    params = {"text": search_query, "page": page, "per_page": per_page}
+    if newest_first:
+        params["order_by"] = "publication_time"
+    if since is not None:
+        params["date_from"] = MOSCOW_TZ.localize(since).isoformat()
+    delay = settings.HH_BACKOFF
+
+    for attempt in range(settings.HH_MAX_RETRIES + 1):
+        started_at = time.perf_counter()
+        try:
+            response = await client.get("/vacancies", params=params)
+        except httpx.TransportError as e:
+            HH_FETCH_DURATION.labels("transport_error").observe(time.perf_counter() - started_at)
+            error = f"{type(e).__name__}: {e}"
+        else:
+            HH_FETCH_DURATION.labels(str(response.status_code)).observe(time.perf_counter() - started_at)
+            if response.status_code == 200:
+                return response.json()
+            error = f"HTTP {response.status_code}"
+            if response.status_code not in RETRY_STATUSES:
+                break
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+
+        if attempt < settings.HH_MAX_RETRIES:
+            logger.warning("⚠️ hh.ru page %s failed (%s), retrying in %.1fs", page, error, delay)
+            HH_FETCH_RETRIES.inc()
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    raise HHFetchError(f"page {page}: {error}")
+
+
+def parse_published_at(value) -> datetime | None:
+    """hh.ru timestamps ("2024-05-01T12:30:00+0300") as naive Moscow time, like the other columns."""
+    try:
+        return datetime.strptime(value, HH_DATE_FORMAT).astimezone(MOSCOW_TZ).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def content_hash(job_data: JobCreate, published_at: datetime | None) -> str:
+    payload = json.dumps([job_data.model_dump(), published_at.isoformat() if published_at else None])
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def vacancy_to_job(vacancy) -> JobSync | None:
+    if not isinstance(vacancy, dict) or not vacancy.get("id"):
+        return None
+
+    employer = vacancy.get("employer")
+    address = vacancy.get("address")
+    schedule = vacancy.get("schedule")
+
+    job_data = JobCreate(
+        title=vacancy.get("name", "Not specified"),
+        status=schedule["name"] if schedule and schedule.get("name") else "Not specified",
+        company_name=employer["name"] if employer and employer.get("name") else "Not specified",
+        company_address=address["city"] if address and address.get("city") else "Not specified",
+        logo_url=employer["logo_urls"]["original"] if employer and employer.get("logo_urls") else "",
+        description=vacancy.get("description", "Description not available"),
+    )
+    published_at = parse_published_at(vacancy.get("published_at"))
+    return JobSync(
+        **job_data.model_dump(),
+        external_id=str(vacancy["id"]),
+        published_at=published_at,
+        content_hash=content_hash(job_data, published_at),
+    )
+
+
+async def _store_page(db: AnySession, client: httpx.AsyncClient, items: list, result: IngestResult):
+    """Upserts one page in a single statement; vacancies whose content hash did not change are not written."""
+    jobs = [job_data for job_data in map(vacancy_to_job, items) if job_data is not None]
+    if jobs:
+        stored = await sync_jobs_async(db, jobs)
+        prefetch_logos(client, [job_data.logo_url for job_data in jobs])
+        result.added += stored["inserted"]
+        result.updated += stored["updated"]
+        result.skipped += stored["unchanged"]
+        result.ids.extend(stored["ids"])
+        published = [job_data.published_at for job_data in jobs if job_data.published_at is not None]
+        if published:
+            result.watermark = max([result.watermark, *published] if result.watermark else published)
+    result.pages += 1
+
+
+async def ingest_vacancies(
+        db: AnySession,
+        client: httpx.AsyncClient,
+        search_query: str,
+        count: int,
+        on_page: Callable[[IngestResult], Awaitable[None]] | None = None,
+        since: datetime | None = None,
+        newest_first: bool = False,
+) -> IngestResult:
+    """
+    Fetches up to `count` vacancies page by page and stores them as pages arrive.
+    - Pages after the first are fetched concurrently, at most HH_CONCURRENCY at a time.
+    - A failing first page raises HHFetchError; later failures are reported in `errors`.
+    - New vacancies are inserted, changed ones updated in place, unchanged ones skipped.
+    """
+    count = max(0, min(count, HH_MAX_DEPTH))
+    result = IngestResult()
+    if count == 0:
+        return result
+
+    per_page = min(count, HH_MAX_PER_PAGE)
+    first = await fetch_page(client, search_query, 0, per_page, since, newest_first)
+    result.found = first.get("found") or 0
+    available_pages = first.get("pages") or 1
+    total_pages = min(math.ceil(count / per_page), available_pages)
+
+    def page_items(page: int, data: dict) -> list:
+        return data.get("items", [])[:count - page * per_page]
+
+    await _store_page(db, client, page_items(0, first), result)
+    if on_page is not None:
+        await on_page(result)
+
+    semaphore = asyncio.Semaphore(settings.HH_CONCURRENCY)
+
+    async def fetch(page: int):
+        async with semaphore:
+            try:
+                return page, await fetch_page(client, search_query, page, per_page, since, newest_first)
+            except HHFetchError as e:
+                return page, e
+
+    tasks = [asyncio.create_task(fetch(page)) for page in range(1, total_pages)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            page, data = await next_done
+            if isinstance(data, HHFetchError):
+                logger.error("❌ API request to hh.ru failed: %s", data)
+                result.errors.append(str(data))
+                continue
+            await _store_page(db, client, page_items(page, data), result)
+            if on_page is not None:
+                await on_page(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return result
+
+
+def sync_key(search_query: str) -> str:
+    return "hh:" + " ".join(search_query.lower().split())
+
+
+async def sync_vacancies(
+        db: AnySession,
+        client: httpx.AsyncClient,
+        search_query: str,
+        count: int,
+        on_page: Callable[[IngestResult], Awaitable[None]] | None = None,
+) -> IngestResult:
+    """
+    Incremental ingest of the newest `count` vacancies of a query.
+    - Asks hh.ru only for vacancies published since the last sync (minus HH_SYNC_OVERLAP), newest first.
+    - The watermark moves forward only when no page failed, so failed pages are fetched again next time.
+    """
+    key = sync_key(search_query)
+    watermark = await get_watermark_async(db, key)
+    since = watermark - timedelta(seconds=settings.HH_SYNC_OVERLAP) if watermark else None
+
+    result = await ingest_vacancies(db, client, search_query, count, on_page=on_page, since=since, newest_first=True)
+
+    if result.errors:
+        logger.warning("⚠️ Sync of %s had failed pages, watermark stays at %s", key, watermark)
+        return result
+    if watermark is not None and result.found > count:
+        # Older ones among the new vacancies are beyond `count`, as on a first sync
+        logger.warning(
+            "⚠️ Sync of %s found %s new vacancies, only the newest %s were stored", key, result.found, count
+        )
+    if result.watermark is not None and (watermark is None or result.watermark > watermark):
+        await set_watermark_async(db, key, result.watermark)
+    return result
@@ -0,0 +1,184 @@
+import codecs
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.job import upsert_jobs_async
+from app.models.base import AnySession, commit_db, rollback_db
+from app.models.job import moscow_now
+from app.schemas.job import JobCreate
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = list(JobCreate.model_fields)
+STAGING_TABLE = "jobs_import"
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    ids: list[int] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, errors: list):
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+
+async def _lines(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in body:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _ndjson_records(body: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, list | None]]:
+    row = 0
+    async for line in _lines(body):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, [{"type": "json_invalid", "msg": str(e)}]
+            continue
+        if not isinstance(record, dict):
+            yield row, None, [{"type": "json_invalid", "msg": "Expected a JSON object"}]
+            continue
+        yield row, record, None
+
+
+async def _csv_records(body: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, list | None]]:
+    """CSV with a header row; quoted fields may span lines and chunk boundaries."""
+    header = None
+    row = 0
+    record_lines = []
+    quotes = 0
+    async for line in _lines(body):
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Inside a quoted field, the record continues on the next line
+            continue
+        values = next(csv.reader(["".join(record_lines)]), [])
+        record_lines, quotes = [], 0
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, [{"type": "csv_invalid", "msg": f"Expected {len(header)} columns, got {len(values)}"}]
+            continue
+        yield row, dict(zip(header, values)), None
+
+
+async def validated_chunks(body: AsyncIterator[bytes], import_format: str, result: ImportResult):
+    """Validates records with JobCreate and yields chunks of (row, JobCreate) pairs."""
+    records = _csv_records(body) if import_format == "csv" else _ndjson_records(body)
+    chunk = []
+    async for row, record, errors in records:
+        result.rows += 1
+        if errors is None:
+            try:
+                chunk.append((row, JobCreate.model_validate(record)))
+            except ValidationError as e:
+                errors = e.errors(include_url=False, include_input=False)
+        if errors is not None:
+            result.add_error(row, errors)
+        if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _asyncpg_connection(db: AnySession):
+    if not isinstance(db, AsyncSession) or db.get_bind().dialect.driver != "asyncpg":
+        return None
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection
+
+
+async def _copy_import(db: AsyncSession, driver_connection, chunks, result: ImportResult):
+    """COPY every chunk into a temporary staging table, then merge into jobs in one statement."""
+    await db.execute(text(
+        f"CREATE TEMP TABLE {STAGING_TABLE} (row_no integer, "
+        + ", ".join(f"{name} text" for name in JOB_FIELDS)
+        + ") ON COMMIT DROP"
+    ))
+
+    staged = 0
+    async for chunk in chunks:
+        records = [(row, *(getattr(job, name) for name in JOB_FIELDS)) for row, job in chunk]
+        await driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=["row_no", *JOB_FIELDS]
+        )
+        staged += len(records)
+
+    columns = ", ".join(JOB_FIELDS)
+    merged = await db.execute(
+        text(
+            f"INSERT INTO jobs ({columns}, created_at, updated_at) "
+            f"SELECT DISTINCT ON (title) {columns}, :now, :now FROM {STAGING_TABLE} "
+            f"ORDER BY title, row_no "
+            f"ON CONFLICT (title) WHERE external_id IS NULL DO NOTHING RETURNING id"
+        ),
+        {"now": moscow_now()},
+    )
+    result.ids = list(merged.scalars())
+    result.inserted = len(result.ids)
+    result.skipped = staged - result.inserted
+
+
+async def _upsert_import(db: AnySession, chunks, result: ImportResult):
+    async for chunk in chunks:
+        stored = await upsert_jobs_async(db, [job for _, job in chunk], commit=False)
+        result.ids.extend(stored["ids"])
+        result.inserted += stored["inserted"]
+        result.skipped += stored["skipped"]
+
+
+async def import_jobs(db: AnySession, body: AsyncIterator[bytes], import_format: str) -> ImportResult:
+    """
+    Streams, validates and loads vacancies in a single transaction.
+    - Postgres (asyncpg): COPY into a staging table and one de-duplicating merge.
+    - Other databases: chunked INSERT ... ON CONFLICT.
+    """
+    result = ImportResult()
+    chunks = validated_chunks(body, import_format, result)
+    try:
+        driver_connection = await _asyncpg_connection(db)
+        if driver_connection is not None:
+            await _copy_import(db, driver_connection, chunks, result)
+        else:
+            await _upsert_import(db, chunks, result)
+        await commit_db(db)
+    except BaseException:
+        await rollback_db(db)
+        raise
+
+    logger.info(
+        "✅ Import finished: %s inserted, %s skipped, %s failed", result.inserted, result.skipped, result.failed
+    )
+    return result
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import uuid
+from functools import partial
+
+import orjson
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.crud.job import get_job_by_id_async
+from app.models.base import AnySession, session_scope
+from app.models.replicas import read_or_primary
+from app.schemas.job import job_payload
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the cached JobOut payload changes shape
+CACHE_VERSION = 3
+
+INVALIDATE_BATCH_SIZE = 1000
+
+# Negative-cache marker for ids that do not exist
+MISSING = "null"
+
+stats = {"hits": 0, "misses": 0, "errors": 0}
+
+# In-process single flight: concurrent misses for the same id share one load. The load runs
+# as its own task, so a cancelled request does not cancel it for everybody waiting on it.
+_inflight: dict[int, asyncio.Task] = {}
+
+# Deletes the lock only while it still holds our token: an expired lock may belong to another worker by now
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_script = None
+
+
+def job_key(job_id: int) -> str:
+    return f"job:v{CACHE_VERSION}:{job_id}"
+
+
+def _lock_key(job_id: int) -> str:
+    return f"job:v{CACHE_VERSION}:{job_id}:lock"
+
+
+def serialize_job(job) -> str:
+    # Same bytes as JobOut.model_dump_json(), without validating the row first
+    return orjson.dumps(job_payload(job)).decode()
+
+
+def get_stats() -> dict:
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hit_ratio": stats["hits"] / lookups if lookups else 0.0}
+
+
+def _release_lock(redis_client: aioredis.Redis):
+    global _release_script
+
+    if _release_script is None or _release_script.registered_client is not redis_client:
+        _release_script = redis_client.register_script(RELEASE_LOCK_LUA)
+    return _release_script
+
+
+async def _load(redis_client: aioredis.Redis, job_id: int) -> str:
+    """
+    Loads from the database under a short Redis lock so only one worker refills a hot key.
+    The row is read on the primary: a replica may still have the version an update just invalidated.
+    Opens its own session: the requests waiting on the load may end before it does.
+    """
+    lock_key = _lock_key(job_id)
+    lock_ttl_ms = int(settings.JOB_CACHE_LOCK_TIMEOUT * 1000)
+    token = uuid.uuid4().hex
+
+    acquired = await redis_client.set(lock_key, token, nx=True, px=lock_ttl_ms)
+    if not acquired:
+        # Somebody else is loading: wait for their value instead of hitting the database
+        deadline = asyncio.get_running_loop().time() + settings.JOB_CACHE_LOCK_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.02)
+            raw = await redis_client.get(job_key(job_id))
+            if raw is not None:
+                return raw
+        # The holder is slow or gone; its lock has expired by now, so try to take over
+        acquired = await redis_client.set(lock_key, token, nx=True, px=lock_ttl_ms)
+
+    try:
+        async with session_scope() as db:
+            job = await get_job_by_id_async(db, job_id)
+        if job is None:
+            raw = MISSING
+            await redis_client.set(job_key(job_id), raw, ex=settings.JOB_CACHE_MISSING_TTL)
+        else:
+            raw = serialize_job(job)
+            await redis_client.set(job_key(job_id), raw, ex=settings.JOB_CACHE_TTL)
+        return raw
+    finally:
+        if acquired:
+            await _release_lock(redis_client)(keys=[lock_key], args=[token])
+
+
+def _load_done(job_id: int, load: asyncio.Task):
+    del _inflight[job_id]
+    if not load.cancelled():
+        # Every waiter may have been cancelled; mark the exception as retrieved
+        load.exception()
+
+
+async def get_job_cached(db: AnySession, redis_client: aioredis.Redis | None, job_id: int) -> dict | None:
+    """
+    Read-through cache for a single vacancy.
+    - Serves the serialized JobOut from Redis when present.
+    - Falls back to the database when Redis is unavailable.
+    """
+    if redis_client is None:
+        job = await read_or_primary(db, get_job_by_id_async, job_id)
+        return orjson.loads(serialize_job(job)) if job is not None else None
+
+    try:
+        raw = await redis_client.get(job_key(job_id))
+        if raw is not None:
+            stats["hits"] += 1
+        else:
+            stats["misses"] += 1
+            load = _inflight.get(job_id)
+            if load is None:
+                load = _inflight[job_id] = asyncio.create_task(_load(redis_client, job_id))
+                load.add_done_callback(partial(_load_done, job_id))
+            raw = await asyncio.shield(load)
+    except RedisError:
+        stats["errors"] += 1
+        logger.error("⚠️ Error while reading vacancy cache from Redis")
+        job = await read_or_primary(db, get_job_by_id_async, job_id)
+        return orjson.loads(serialize_job(job)) if job is not None else None
+
+    return orjson.loads(raw)
+
+
+async def refresh_job(redis_client: aioredis.Redis | None, job):
+    """Write-through after an update."""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(job_key(job.id), serialize_job(job), ex=settings.JOB_CACHE_TTL)
+    except RedisError:
+        logger.error("⚠️ Error while refreshing vacancy cache in Redis")
+
+
+async def refresh_jobs(redis_client: aioredis.Redis | None, jobs: list):
+    """Write-through after a batch update, pipelined like invalidate_jobs."""
+    if redis_client is None or not jobs:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for start in range(0, len(jobs), INVALIDATE_BATCH_SIZE):
+                for job in jobs[start:start + INVALIDATE_BATCH_SIZE]:
+                    pipe.set(job_key(job.id), serialize_job(job), ex=settings.JOB_CACHE_TTL)
+                await pipe.execute()
+    except RedisError:
+        logger.error("⚠️ Error while refreshing vacancy cache in Redis")
+
+
+async def invalidate_jobs(redis_client: aioredis.Redis | None, job_ids: list[int]):
+    if redis_client is None or not job_ids:
+        return
+    try:
+        # Bounded DELs in one pipeline: large imports return tens of thousands of ids
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for start in range(0, len(job_ids), INVALIDATE_BATCH_SIZE):
+                pipe.delete(*[job_key(job_id) for job_id in job_ids[start:start + INVALIDATE_BATCH_SIZE]])
+            await pipe.execute()
+    except RedisError:
+        logger.error("⚠️ Error while invalidating vacancy cache in Redis")
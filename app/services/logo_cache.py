@@ -0,0 +1,308 @@
+"""
+On-disk cache of vacancy logos.
+
+Layout under LOGO_CACHE_DIR:
+    urls/<sha256 of the URL>               -> "<content digest> <content type>"
+    objects/<ab>/<content digest>          -> original image, content-addressed
+    objects/<ab>/<content digest>-<size>   -> WebP thumbnail, <size> px on the longer side
+
+- Identical images behind different URLs are stored once.
+- The total size is capped by LOGO_CACHE_MAX_BYTES; least recently used files go first.
+  Hits refresh a file's mtime at most once per LOGO_TOUCH_INTERVAL, which the eviction sorts by.
+- Thumbnails need Pillow (in requirements.txt); without it thumbnails_available() is False.
+- Only raster images from LOGO_ALLOWED_HOSTS over https are fetched.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+THUMBNAIL_TYPE = "image/webp"
+# Caches below this share of the cap after an eviction, so evictions stay rare
+EVICT_TO = 0.9
+# Files still being written; the eviction scan leaves them alone
+TEMP_PREFIX = ".tmp-"
+
+# In-process single flight: concurrent misses for the same URL share one download. It runs
+# as its own task, so a cancelled request does not cancel it for everybody waiting on it.
+_inflight: dict[str, asyncio.Task] = {}
+_prefetching: set[asyncio.Task] = set()
+_prefetch_semaphore: asyncio.Semaphore | None = None
+# Bytes written since the last eviction scan; the scan itself measures the real total.
+# Files are stored from to_thread workers: _size_lock guards both counters, _scan_lock
+# lets one worker scan while the others keep writing.
+_written_since_scan = 0
+_cache_bytes: int | None = None
+_size_lock = threading.Lock()
+_scan_lock = threading.Lock()
+
+
+class LogoUnavailable(Exception):
+    pass
+
+
+@dataclass
+class CachedLogo:
+    path: Path
+    media_type: str
+    digest: str
+
+
+def thumbnails_available() -> bool:
+    return Image is not None
+
+
+def cache_dir() -> Path:
+    return Path(settings.LOGO_CACHE_DIR)
+
+
+def _url_path(url: str) -> Path:
+    return cache_dir() / "urls" / hashlib.sha256(url.encode()).hexdigest()
+
+
+def _object_path(digest: str, size: int | None = None) -> Path:
+    name = digest if size is None else f"{digest}-{size}"
+    return cache_dir() / "objects" / digest[:2] / name
+
+
+def is_allowed(url: str) -> bool:
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    allowed = [domain.strip().lower() for domain in settings.LOGO_ALLOWED_HOSTS.split(",") if domain.strip()]
+    return parts.scheme == "https" and any(host == domain or host.endswith("." + domain) for domain in allowed)
+
+
+def _write_atomic(path: Path, data: bytes):
+    global _written_since_scan
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    with _size_lock:
+        _written_since_scan += len(data)
+
+
+def _touch(path: Path):
+    """Approximate LRU: refreshing mtime on every hit would turn reads into metadata writes."""
+    try:
+        if time.time() - path.stat().st_mtime > settings.LOGO_TOUCH_INTERVAL:
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _thumbnails(data: bytes) -> dict[int, bytes]:
+    if Image is None:
+        return {}
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image.load()
+            thumbnails = {}
+            for size in settings.LOGO_THUMBNAIL_SIZES:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((size, size))
+                if thumbnail.mode not in ("RGB", "RGBA"):
+                    thumbnail = thumbnail.convert("RGBA")
+                buffer = BytesIO()
+                thumbnail.save(buffer, "WEBP", quality=85)
+                thumbnails[size] = buffer.getvalue()
+            return thumbnails
+    except Exception as e:
+        # Undecodable images are still served as they are
+        logger.warning("⚠️ Could not build logo thumbnails: %s: %s", type(e).__name__, e)
+        return {}
+
+
+def _store(url: str, data: bytes, media_type: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    if not _object_path(digest).exists():
+        _write_atomic(_object_path(digest), data)
+        for size, thumbnail in _thumbnails(data).items():
+            _write_atomic(_object_path(digest, size), thumbnail)
+    _write_atomic(_url_path(url), f"{digest} {media_type}".encode())
+    _evict_if_needed()
+    return digest
+
+
+def _lookup(url: str, size: int | None) -> CachedLogo | None:
+    try:
+        digest, media_type = _url_path(url).read_text().split(" ", 1)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    original = _object_path(digest)
+    if not original.exists():
+        # Evicted: fetch again
+        return None
+    _touch(_url_path(url))
+    _touch(original)
+
+    if size is not None:
+        thumbnail = _object_path(digest, size)
+        if thumbnail.exists():
+            _touch(thumbnail)
+            return CachedLogo(thumbnail, THUMBNAIL_TYPE, f"{digest}-{size}")
+    return CachedLogo(original, media_type, digest)
+
+
+def _evict_if_needed():
+    """Deletes the least recently used files until the cache is below EVICT_TO of the cap."""
+    with _size_lock:
+        if _cache_bytes is not None and _cache_bytes + _written_since_scan <= settings.LOGO_CACHE_MAX_BYTES:
+            return
+    if not _scan_lock.acquire(blocking=False):
+        # Another worker is scanning already
+        return
+    try:
+        _evict()
+    finally:
+        _scan_lock.release()
+
+
+def _evict():
+    global _written_since_scan, _cache_bytes
+
+    with _size_lock:
+        written_before_scan = _written_since_scan
+
+    files = []
+    for directory, _, names in os.walk(cache_dir()):
+        for name in names:
+            if name.startswith(TEMP_PREFIX):
+                continue
+            path = Path(directory) / name
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+
+    if total > settings.LOGO_CACHE_MAX_BYTES:
+        target = settings.LOGO_CACHE_MAX_BYTES * EVICT_TO
+        evicted = 0
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        logger.info("✅ Logo cache evicted %s files, %s bytes left", evicted, total)
+
+    with _size_lock:
+        # Writes that finished during the scan may not have been seen by it
+        _cache_bytes = total
+        _written_since_scan -= written_before_scan
+
+
+async def _download(client: httpx.AsyncClient, url: str) -> tuple[bytes, str]:
+    try:
+        async with client.stream("GET", url, timeout=settings.LOGO_FETCH_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise LogoUnavailable(f"HTTP {response.status_code}")
+            media_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if media_type not in IMAGE_TYPES:
+                raise LogoUnavailable(f"unsupported content type {media_type or 'none'}")
+
+            chunks, received = [], 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > settings.LOGO_MAX_BYTES:
+                    raise LogoUnavailable(f"larger than {settings.LOGO_MAX_BYTES} bytes")
+                chunks.append(chunk)
+    except httpx.HTTPError as e:
+        raise LogoUnavailable(f"{type(e).__name__}: {e}")
+    return b"".join(chunks), media_type
+
+
+async def _fetch(client: httpx.AsyncClient, url: str):
+    data, media_type = await _download(client, url)
+    # Hashing, resizing and writing files stay off the event loop
+    await asyncio.to_thread(_store, url, data, media_type)
+
+
+def _fetch_done(url: str, fetch: asyncio.Task):
+    del _inflight[url]
+    if not fetch.cancelled():
+        # Every waiter may have been cancelled; mark the exception as retrieved
+        fetch.exception()
+
+
+async def get_logo(client: httpx.AsyncClient, url: str, size: int | None = None) -> CachedLogo:
+    """Path of the cached logo (or its thumbnail), downloading it first on a miss. Raises LogoUnavailable."""
+    if not is_allowed(url):
+        raise LogoUnavailable("host is not allowed")
+
+    cached = await asyncio.to_thread(_lookup, url, size)
+    if cached is not None:
+        return cached
+
+    fetch = _inflight.get(url)
+    if fetch is None:
+        fetch = _inflight[url] = asyncio.create_task(_fetch(client, url))
+        fetch.add_done_callback(partial(_fetch_done, url))
+    await asyncio.shield(fetch)
+
+    cached = await asyncio.to_thread(_lookup, url, size)
+    if cached is None:
+        raise LogoUnavailable("evicted right after download")
+    return cached
+
+
+async def _prefetch(client: httpx.AsyncClient, url: str):
+    global _prefetch_semaphore
+
+    if _prefetch_semaphore is None:
+        _prefetch_semaphore = asyncio.Semaphore(settings.LOGO_PREFETCH_CONCURRENCY)
+    async with _prefetch_semaphore:
+        try:
+            await get_logo(client, url)
+        except LogoUnavailable as e:
+            logger.warning("⚠️ Logo prefetch of %s failed: %s", url, e)
+        except Exception:
+            # Nobody awaits this task: an unexpected error would otherwise go unnoticed
+            logger.exception("⚠️ Logo prefetch of %s failed", url)
+
+
+def prefetch_logos(client: httpx.AsyncClient, urls):
+    """Downloads logos in background tasks, so ingestion does not wait for them."""
+    if not settings.LOGO_PREFETCH:
+        return
+    for url in {url for url in urls if url and is_allowed(url)}:
+        if url in _inflight:
+            continue
+        task = asyncio.create_task(_prefetch(client, url))
+        _prefetching.add(task)
+        task.add_done_callback(_prefetching.discard)
+
+
+async def wait_for_prefetch():
+    """Lets running prefetches finish before the HTTP client is closed."""
+    if _prefetching:
+        await asyncio.gather(*_prefetching, return_exceptions=True)
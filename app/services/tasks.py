@@ -0,0 +1,308 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import uuid
+
+import httpx
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.models.base import session_scope
+from app.models.job import moscow_now
+from app.services.hh import HHFetchError, IngestResult, get_http_client, ingest_vacancies, sync_vacancies
+from app.services.job_cache import invalidate_jobs
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "parse:queue"
+# Ids of the workers that may hold tasks; see recover_tasks
+WORKERS_KEY = "parse:workers"
+
+# Statuses: queued -> running -> completed | failed
+FINISHED = ("completed", "failed")
+
+# Claims the dedup marker of a query and queues the task in one step. The marker is taken
+# only while it still holds ARGV[1] ("" for none): two requests replacing the same stale
+# marker can't both queue a task. Returns 1 when claimed.
+CLAIM_LUA = """
+local current = redis.call('GET', KEYS[1]) or ''
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('LPUSH', KEYS[2], ARGV[2])
+return 1
+"""
+_claim_script = None
+
+# Fallback when Redis is unavailable: tasks run inside the API process
+_local_tasks: dict[str, dict] = {}
+_local_inflight: dict[str, str] = {}
+_local_running: set[asyncio.Task] = set()
+
+
+def task_key(task_id: str) -> str:
+    return f"parse:task:{task_id}"
+
+
+def _inflight_key(digest: str) -> str:
+    return f"parse:inflight:{digest}"
+
+
+def processing_key(worker_id: str) -> str:
+    return f"parse:processing:{worker_id}"
+
+
+def heartbeat_key(worker_id: str) -> str:
+    return f"parse:heartbeat:{worker_id}"
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def query_digest(search_query: str, count: int, sync: bool = False) -> str:
+    normalized = " ".join(search_query.lower().split())
+    return hashlib.sha1(f"{normalized}|{count}|{int(sync)}".encode()).hexdigest()
+
+
+def _new_task(task_id: str, search_query: str, count: int, digest: str, sync: bool = False) -> dict:
+    return {
+        "task_id": task_id,
+        "status": "queued",
+        "search_query": search_query,
+        "count": count,
+        # Stored as 0/1, Redis hashes do not take booleans
+        "sync": int(sync),
+        "digest": digest,
+        "added": 0,
+        "updated": 0,
+        "skipped": 0,
+        "pages": 0,
+        # Times the task was requeued after its worker died
+        "attempts": 0,
+        "errors": [],
+        "created_at": moscow_now().isoformat(),
+        "finished_at": None,
+    }
+
+
+def _encode(fields: dict) -> dict:
+    # Redis hashes hold strings; lists go in as JSON, None is left out
+    return {
+        name: json.dumps(value) if isinstance(value, list) else value
+        for name, value in fields.items()
+        if value is not None
+    }
+
+
+def _decode(fields: dict) -> dict:
+    task = dict(fields)
+    for name in ("count", "sync", "added", "updated", "skipped", "pages", "attempts"):
+        task[name] = int(task.get(name, 0))
+    task["errors"] = json.loads(task.get("errors", "[]"))
+    task.setdefault("finished_at", None)
+    return task
+
+
+def _claim(redis_client: aioredis.Redis):
+    global _claim_script
+
+    if _claim_script is None or _claim_script.registered_client is not redis_client:
+        _claim_script = redis_client.register_script(CLAIM_LUA)
+    return _claim_script
+
+
+async def enqueue_parse(
+        redis_client: aioredis.Redis | None, search_query: str, count: int, sync: bool = False
+) -> tuple[dict, bool]:
+    """
+    Queues a parse task, or returns the in-flight task for an identical query.
+    Returns the task and whether it was deduplicated.
+    """
+    digest = query_digest(search_query, count, sync)
+    task_id = uuid.uuid4().hex
+
+    if redis_client is None:
+        existing = _local_inflight.get(digest)
+        if existing is not None:
+            return _local_tasks[existing], True
+        task = _local_tasks[task_id] = _new_task(task_id, search_query, count, digest, sync)
+        _local_inflight[digest] = task_id
+        running = asyncio.create_task(run_parse_task(None, task_id))
+        _local_running.add(running)
+        running.add_done_callback(_local_running.discard)
+        return task, False
+
+    # Stored first: whoever finds our marker must also find the task
+    task = _new_task(task_id, search_query, count, digest, sync)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(task_key(task_id), mapping=_encode(task))
+        pipe.expire(task_key(task_id), settings.PARSE_DEDUP_TTL + settings.PARSE_TASK_TTL)
+        await pipe.execute()
+
+    claim = _claim(redis_client)
+    seen = ""
+    while True:
+        if await claim(keys=[_inflight_key(digest), QUEUE_KEY], args=[seen, task_id, settings.PARSE_DEDUP_TTL]):
+            return task, False
+        seen = await redis_client.get(_inflight_key(digest)) or ""
+        existing = await get_task(redis_client, seen) if seen else None
+        if existing is not None and existing["status"] not in FINISHED:
+            await redis_client.delete(task_key(task_id))
+            return existing, True
+        # Stale marker of a finished or expired task: replace it, unless somebody else does first
+
+
+async def get_task(redis_client: aioredis.Redis | None, task_id: str) -> dict | None:
+    if redis_client is None:
+        return _local_tasks.get(task_id)
+    fields = await redis_client.hgetall(task_key(task_id))
+    return _decode(fields) if fields else None
+
+
+async def _update_task(redis_client: aioredis.Redis | None, task_id: str, **fields):
+    if redis_client is None:
+        _local_tasks[task_id].update(fields)
+        return
+    await redis_client.hset(task_key(task_id), mapping=_encode(fields))
+
+
+async def _finish_task(redis_client: aioredis.Redis | None, task: dict, **fields):
+    fields["finished_at"] = moscow_now().isoformat()
+    if redis_client is None:
+        _local_tasks[task["task_id"]].update(fields)
+        _local_inflight.pop(task["digest"], None)
+        return
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(task_key(task["task_id"]), mapping=_encode(fields))
+        pipe.expire(task_key(task["task_id"]), settings.PARSE_TASK_TTL)
+        pipe.delete(_inflight_key(task["digest"]))
+        await pipe.execute()
+
+
+def _progress(result: IngestResult) -> dict:
+    return {
+        "added": result.added,
+        "updated": result.updated,
+        "skipped": result.skipped,
+        "pages": result.pages,
+        "errors": result.errors,
+    }
+
+
+async def run_parse_task(redis_client: aioredis.Redis | None, task_id: str, client: httpx.AsyncClient | None = None):
+    """Runs one parse task and records its progress; used by app.worker and by the local fallback."""
+    task = await get_task(redis_client, task_id)
+    if task is None:
+        logger.warning("⚠️ Parse task %s expired before it was started", task_id)
+        return
+
+    logger.info("✅ Parse task %s started: %s (%s)", task_id, task["search_query"], task["count"])
+    await _update_task(redis_client, task_id, status="running")
+
+    async def on_page(result: IngestResult):
+        await _update_task(redis_client, task_id, **_progress(result))
+
+    ingest = sync_vacancies if task["sync"] else ingest_vacancies
+    try:
+        async with session_scope() as db:
+            result = await ingest(
+                db, client or await get_http_client(), task["search_query"], task["count"], on_page=on_page
+            )
+    except HHFetchError as e:
+        logger.error("❌ Parse task %s failed: %s", task_id, e)
+        await _finish_task(redis_client, task, status="failed", errors=[str(e)])
+        return
+    except Exception as e:
+        logger.exception("❌ Parse task %s crashed", task_id)
+        await _finish_task(redis_client, task, status="failed", errors=[f"{type(e).__name__}: {e}"])
+        return
+
+    await invalidate_jobs(redis_client, result.ids)
+    await _finish_task(redis_client, task, status="completed", **_progress(result))
+    logger.info(
+        "✅ Parse task %s completed: %s added, %s updated, %s unchanged",
+        task_id, result.added, result.updated, result.skipped,
+    )
+
+
+async def next_task_id(redis_client: aioredis.Redis, worker_id: str) -> str | None:
+    """
+    Takes the next task and parks it in the worker's processing list, so it is not lost if the
+    worker dies before finishing it. Call ack_task once the task is finished.
+    """
+    try:
+        return await redis_client.blmove(
+            QUEUE_KEY, processing_key(worker_id), settings.PARSE_QUEUE_POLL, "RIGHT", "LEFT"
+        )
+    except RedisError:
+        logger.error("⚠️ Error while reading the parse queue from Redis")
+        await asyncio.sleep(1)
+        return None
+
+
+async def ack_task(redis_client: aioredis.Redis, worker_id: str, task_id: str):
+    await redis_client.lrem(processing_key(worker_id), 1, task_id)
+
+
+async def heartbeat(redis_client: aioredis.Redis, worker_id: str):
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.sadd(WORKERS_KEY, worker_id)
+        pipe.set(heartbeat_key(worker_id), moscow_now().isoformat(), ex=settings.PARSE_HEARTBEAT_TTL)
+        await pipe.execute()
+
+
+async def _requeue(redis_client: aioredis.Redis, worker_id: str, task_id: str):
+    task = await get_task(redis_client, task_id)
+    if task is None or task["status"] in FINISHED:
+        # Expired, or finished right before the worker died: nothing left to run
+        await redis_client.lrem(processing_key(worker_id), 1, task_id)
+        return
+
+    attempts = await redis_client.hincrby(task_key(task_id), "attempts", 1)
+    if attempts >= settings.PARSE_TASK_MAX_ATTEMPTS:
+        logger.error("❌ Parse task %s failed: worker %s died, %s attempts", task_id, worker_id, attempts)
+        await _finish_task(redis_client, task, status="failed", errors=[f"worker died ({attempts} attempts)"])
+        await redis_client.lrem(processing_key(worker_id), 1, task_id)
+        return
+
+    # Stored pages are upserted again, so a rerun only repeats work
+    logger.warning("⚠️ Parse task %s requeued: worker %s died", task_id, worker_id)
+    await _update_task(redis_client, task_id, status="queued")
+    await redis_client.lmove(processing_key(worker_id), QUEUE_KEY, "RIGHT", "LEFT")
+
+
+async def recover_tasks(redis_client: aioredis.Redis):
+    """
+    Requeues the tasks held by workers whose heartbeat expired (crashed or killed),
+    or marks them failed after PARSE_TASK_MAX_ATTEMPTS. Run by every worker on start and periodically.
+    """
+    for worker_id in await redis_client.smembers(WORKERS_KEY):
+        if await redis_client.exists(heartbeat_key(worker_id)):
+            continue
+        # Only one worker sweeps a dead worker's list
+        lock = f"parse:recover:{worker_id}"
+        if not await redis_client.set(lock, "1", nx=True, ex=settings.PARSE_HEARTBEAT_TTL):
+            continue
+        try:
+            while (task_id := await redis_client.lindex(processing_key(worker_id), -1)) is not None:
+                await _requeue(redis_client, worker_id, task_id)
+            await redis_client.srem(WORKERS_KEY, worker_id)
+        finally:
+            await redis_client.delete(lock)
+
+
+async def keep_alive(redis_client: aioredis.Redis, worker_id: str):
+    """Background task of the worker: heartbeat plus a sweep for tasks of dead workers."""
+    while True:
+        await asyncio.sleep(settings.PARSE_HEARTBEAT_INTERVAL)
+        try:
+            await heartbeat(redis_client, worker_id)
+            await recover_tasks(redis_client)
+        except RedisError:
+            logger.error("⚠️ Error while sending the parse worker heartbeat to Redis")
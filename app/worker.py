@@ -0,0 +1,91 @@
+"""
+Parse task worker.
+
+Run one or more processes next to the API:
+    python -m app.worker
+"""
+import asyncio
+import logging
+import signal
+
+from prometheus_client import start_http_server
+
+from app.core.config import settings
+from app.core.logs import setup_logging
+from app.core.redis_client import init_redis, close_redis
+from app.models.base import async_engine
+from app.services.hh import init_http_client, close_http_client
+from app.services.logo_cache import wait_for_prefetch
+from app.services.tasks import (
+    ack_task,
+    heartbeat,
+    heartbeat_key,
+    keep_alive,
+    new_worker_id,
+    next_task_id,
+    recover_tasks,
+    run_parse_task,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_and_ack(redis_client, worker_id: str, task_id: str, client):
+    await run_parse_task(redis_client, task_id, client)
+    # Only a task that got this far is dropped from the processing list; one that raised
+    # stays there and is requeued by recover_tasks once this worker stops
+    await ack_task(redis_client, worker_id, task_id)
+
+
+async def run_worker():
+    # Blocking queue reads need a longer socket timeout than regular commands
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+        logger.info("✅ Worker metrics served on port %s", settings.WORKER_METRICS_PORT)
+
+    redis_client = await init_redis(command_timeout=settings.PARSE_QUEUE_POLL + settings.REDIS_COMMAND_TIMEOUT)
+    if redis_client is None:
+        raise SystemExit("Redis is required to run the parse worker")
+    client = await init_http_client()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    worker_id = new_worker_id()
+    await heartbeat(redis_client, worker_id)
+    await recover_tasks(redis_client)
+    keep_alive_task = asyncio.create_task(keep_alive(redis_client, worker_id))
+
+    semaphore = asyncio.Semaphore(settings.PARSE_WORKER_CONCURRENCY)
+    running: set[asyncio.Task] = set()
+    logger.info("✅ Parse worker %s started (concurrency=%s)", worker_id, settings.PARSE_WORKER_CONCURRENCY)
+
+    while not stopping.is_set():
+        await semaphore.acquire()
+        task_id = await next_task_id(redis_client, worker_id)
+        if task_id is None:
+            semaphore.release()
+            continue
+        task = asyncio.create_task(run_and_ack(redis_client, worker_id, task_id, client))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        task.add_done_callback(lambda _: semaphore.release())
+
+    logger.info("✅ Parse worker stopping, waiting for running tasks")
+    await asyncio.gather(*running, return_exceptions=True)
+    keep_alive_task.cancel()
+    # Hands anything left in the processing list back to the queue right away
+    await redis_client.delete(heartbeat_key(worker_id))
+    await recover_tasks(redis_client)
+    await wait_for_prefetch()
+    await close_http_client()
+    await close_redis()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(run_worker())
@@ -0,0 +1,44 @@
+import math
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+# Search results the stub pretends to have for every query
+TOTAL_VACANCIES = 2000
+MSK = timezone(timedelta(hours=3))
+# Vacancy n of a query was published n minutes before this moment
+LATEST_PUBLISHED_AT = datetime(2026, 1, 1, 12, 0, tzinfo=MSK)
+
+
+def _vacancy(query: str, number: int) -> dict:
+    return {
+        # Distinct per query, like real hh.ru ids are distinct per vacancy
+        "id": f"{zlib.crc32(query.encode())}{number:05d}",
+        "name": f"{query} #{number}",
+        "employer": {"name": f"Company {number % 50}", "logo_urls": {"original": f"https://example.com/{number % 50}.png"}},
+        "address": {"city": "Moscow"},
+        "schedule": {"name": "Full day"},
+        "description": f"Vacancy {number} for {query}",
+        "published_at": (LATEST_PUBLISHED_AT - timedelta(minutes=number)).strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    params = request.url.params
+    query = params.get("text", "")
+    page = int(params.get("page", 0))
+    per_page = int(params.get("per_page", 20))
+    total = TOTAL_VACANCIES
+    if "date_from" in params:
+        # Newest first, so the vacancies published after date_from are the first ones
+        minutes = (LATEST_PUBLISHED_AT - datetime.fromisoformat(params["date_from"])).total_seconds() // 60
+        total = max(0, min(total, int(minutes) + 1))
+    start = page * per_page
+    items = [_vacancy(query, number) for number in range(start, min(start + per_page, total))]
+    return httpx.Response(200, json={"items": items, "pages": max(1, math.ceil(total / per_page)), "found": total})
+
+
+def create_transport() -> httpx.MockTransport:
+    """In-process stand-in for the hh.ru /vacancies API, deterministic for a given query."""
+    return httpx.MockTransport(_handler)
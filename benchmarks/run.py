@@ -0,0 +1,296 @@
+"""
+In-process benchmarks of the auth and vacancy hot paths.
+
+Drives the ASGI app from main.py through httpx, with a fake Redis and a stubbed hh.ru API:
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.run                                   # SQLite in a temp directory
+    python -m benchmarks.run --database-url postgresql://...   # migrated local Postgres
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_CONCURRENCY = [1, 8, 32]
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+
+def configure_environment(database_url: str | None, rate_limit: bool):
+    """Settings are read when the app is imported, so this has to run first."""
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("POSTGRES_PASSWORD", "")
+    os.environ.setdefault("POSTGRES_PORT", "5432")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-of-sufficient-length")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ["RATE_LIMIT_ENABLED"] = "true" if rate_limit else "false"
+    return database_url
+
+
+@dataclass
+class Context:
+    client: "httpx.AsyncClient"
+    headers: dict
+    job_ids: list[int]
+    counter: itertools.count
+
+
+Scenario = Callable[[Context], Awaitable["httpx.Response"]]
+
+
+async def login(ctx: Context):
+    return await ctx.client.post("/auth/token", json={"username": USERNAME, "password": PASSWORD})
+
+
+async def protected(ctx: Context):
+    return await ctx.client.get("/auth/protected", headers=ctx.headers)
+
+
+def vacancy_form(title: str, status: str = "Full day") -> dict:
+    return {
+        "title": title,
+        "status": status,
+        "company_name": "Bench",
+        "company_address": "Moscow",
+        "logo_url": "https://example.com/bench.png",
+        "description": "Written by the benchmark",
+    }
+
+
+async def vacancy_create(ctx: Context):
+    return await ctx.client.post("/vacancy/create", data=vacancy_form(f"Benchmark vacancy {next(ctx.counter)}"))
+
+
+async def vacancy_get(ctx: Context):
+    job_id = ctx.job_ids[next(ctx.counter) % len(ctx.job_ids)]
+    return await ctx.client.get(f"/vacancy/get/{job_id}")
+
+
+async def vacancy_update(ctx: Context):
+    n = next(ctx.counter)
+    job_id = ctx.job_ids[n % len(ctx.job_ids)]
+    return await ctx.client.put(
+        f"/vacancy/update/{job_id}", data=vacancy_form(f"Benchmark update {job_id}", status=f"Updated {n}")
+    )
+
+
+async def vacancy_list(ctx: Context):
+    return await ctx.client.get("/vacancy/list", params={"limit": 20})
+
+
+async def parse(ctx: Context):
+    """Queue a task and run it the way app.worker does; measures enqueue plus ingestion."""
+    from app.core.redis_client import get_redis
+    from app.services.tasks import run_parse_task
+
+    response = await ctx.client.post(
+        "/vacancy/parse", params={"search_query": f"bench parse {next(ctx.counter)}", "count": 200}
+    )
+    if response.status_code == 202:
+        await run_parse_task(get_redis(), response.json()["task_id"])
+    return response
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "login": login,
+    "protected": protected,
+    "vacancy_create": vacancy_create,
+    "vacancy_get": vacancy_get,
+    "vacancy_update": vacancy_update,
+    "vacancy_list": vacancy_list,
+    "parse": parse,
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+async def measure(ctx: Context, scenario: Scenario, concurrency: int, requests: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await scenario(ctx)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def user():
+        nonlocal errors
+        while next(remaining) < requests:
+            started_at = time.perf_counter()
+            response = await scenario(ctx)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def prepare(client, seed: int) -> Context:
+    await client.post("/users/register", data={"username": USERNAME, "password": PASSWORD})
+    token = (await login(Context(client, {}, [], itertools.count()))).json()["access_token"]
+
+    job_ids = []
+    run_id = int(time.time())
+    for offset in range(0, seed, 1000):
+        batch = [
+            {
+                "title": f"Seed {run_id}-{n}",
+                "status": "Full day",
+                "company_name": f"Company {n % 50}",
+                "company_address": "Moscow",
+                "logo_url": "",
+                "description": f"Seeded vacancy {n}",
+            }
+            for n in range(offset, min(offset + 1000, seed))
+        ]
+        response = await client.post("/vacancy/bulk", json=batch)
+        response.raise_for_status()
+        job_ids.extend(response.json()["ids"])
+
+    return Context(client, {"Authorization": f"Bearer {token}"}, job_ids, itertools.count(run_id * 1000))
+
+
+async def run(args) -> dict:
+    import fakeredis
+    import httpx
+
+    import main
+    from app.core import redis_client
+    from app.services import hh
+    from benchmarks.hh_stub import create_transport
+
+    server = fakeredis.FakeServer()
+    redis_client.create_redis_client = lambda command_timeout=None: fakeredis.aioredis.FakeRedis(
+        server=server, decode_responses=True
+    )
+    hh.http_client = hh.create_http_client(transport=create_transport())
+
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            ctx = await prepare(client, args.seed)
+            for name in args.scenarios:
+                results[name] = {}
+                for concurrency in args.concurrency:
+                    requests, warmup = args.requests, args.warmup
+                    if name == "parse":
+                        # Every parse stores 200 vacancies, keep the run short
+                        requests, warmup = max(concurrency, requests // 20), min(warmup, 1)
+                    stats = await measure(ctx, SCENARIOS[name], concurrency, requests, warmup)
+                    results[name][str(concurrency)] = stats
+                    print(
+                        f"{name:<16} c={concurrency:<4} {stats['rps']:>9.1f} rps  "
+                        f"p50 {stats['p50_ms']:>8.2f}  p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms"
+                        + (f"  errors {stats['errors']}" if stats["errors"] else "")
+                    )
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints the change against a baseline run and returns the regressions above `threshold` percent."""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')}):")
+    for name, levels in results.items():
+        for concurrency, stats in levels.items():
+            base = baseline["results"].get(name, {}).get(concurrency)
+            if base is None:
+                continue
+            p95_change = (stats["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+            rps_change = (stats["rps"] / base["rps"] - 1) * 100 if base["rps"] else 0.0
+            regressed = p95_change > threshold or rps_change < -threshold
+            print(f"{name:<16} c={concurrency:<4} rps {rps_change:+7.1f}%  p95 {p95_change:+7.1f}%" + ("  <- regression" if regressed else ""))
+            if regressed:
+                regressions.append(f"{name} c={concurrency}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to SQLite in a temporary directory")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=2000, help="vacancies created before measuring")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the login rate limits enabled")
+    parser.add_argument("--output", type=Path, help="defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--baseline", type=Path, help="earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold, percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    database_url = configure_environment(args.database_url, args.rate_limit)
+    # Request logging would dominate the measurements
+    logging.disable(logging.WARNING)
+
+    timestamp = datetime.now(timezone.utc)
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": timestamp.isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{timestamp:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(f"Regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main_cli()
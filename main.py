@@ -1,17 +1,88 @@
+import time
+
+_import_started_at = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 
 import logging
-import redis
 from starlette.middleware.cors import CORSMiddleware
 
-from app.models.base import Base, engine
+from app.models.base import async_engine
+from app.models.replicas import StickyPrimaryMiddleware, replica_set
 from app.routers import auth, users, job
 
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.logs import RequestContextMiddleware, setup_logging
+from app.core.metrics import render_metrics
+from app.core.redis_client import close_redis
+from app.core.responses import APIResponse, NegotiationMiddleware
+from app.core.startup import (
+    calibrate_password_policy,
+    check_database,
+    connect_redis,
+    readiness,
+    record_startup,
+    retry_database,
+    timed_check,
+)
+from app.core.token_cache import listen_for_invalidations
+from app.services.hh import init_http_client, close_http_client
+from app.services.logo_cache import wait_for_prefetch
+
+logger = logging.getLogger(__name__)
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started_at = time.perf_counter()
+    hashing_executor.start()
+    # Independent steps run concurrently, each bounded by STARTUP_TIMEOUT
+    steps = [
+        timed_check("database", check_database),
+        timed_check("redis", connect_redis),
+        timed_check("http_client", init_http_client),
+    ]
+    if replica_set.replicas:
+        steps.append(timed_check("replicas", replica_set.check))
+    _, redis_client, *_ = await asyncio.gather(*steps)
+    if settings.PASSWORD_CALIBRATE:
+        # Needs Redis to share the result; CPU-bound work runs in a thread, only in the first worker
+        await timed_check("password_policy", lambda: calibrate_password_policy(redis_client), timeout=60)
+    background = []
+    if redis_client is not None:
+        background.append(asyncio.create_task(listen_for_invalidations(redis_client)))
+    if not readiness.ready:
+        logger.warning("⚠️ Database is not available yet, /readyz reports 503 until it is")
+        background.append(asyncio.create_task(retry_database()))
+    if replica_set.replicas:
+        background.append(asyncio.create_task(replica_set.monitor()))
+
+    record_startup(IMPORT_SECONDS, time.perf_counter() - started_at)
+    logger.info("✅ Started in %.3fs (import %.3fs)", readiness.startup_seconds, readiness.import_seconds)
+    yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_redis()
+    await wait_for_prefetch()
+    await close_http_client()
+    hashing_executor.shutdown()
+    await replica_set.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
-app = FastAPI(title="Auth API", root_path="/api/v1")
+app = FastAPI(title="Auth API", root_path="/api/v1", lifespan=lifespan, default_response_class=APIResponse)
+
+app.add_middleware(NegotiationMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +90,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
-
-Base.metadata.create_all(bind=engine)
+if replica_set.replicas:
+    app.add_middleware(StickyPrimaryMiddleware)
+# Outermost, so that every log record of the request carries its id
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(auth.router, prefix="/auth")
 app.include_router(users.router, prefix="/users")
@@ -31,4 +105,29 @@ app.include_router(job.router, prefix="/vacancy")
 async def redirect_to_docs():
     return RedirectResponse(url="/docs")
 
+
+@app.get("/healthz", summary="Liveness probe")
+async def healthz():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz", summary="Readiness probe")
+async def readyz():
+    """
+    **Readiness probe**
+    - ✅ 200 once the database (and schema check) succeeded; Redis outages report "degraded".
+    - ⏳ 503 while the database is not reachable yet.
+    """
+    return JSONResponse(readiness.as_dict(), status_code=200 if readiness.ready else 503)
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
+
+IMPORT_SECONDS = time.perf_counter() - _import_started_at
+
 # Запуск: `uvicorn main:app --reload`
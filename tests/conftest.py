@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite database before importing it
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LOGO_PREFETCH", "false")
+
+import pytest
+
+import app.models.job  # noqa: F401
+import app.models.sync_state  # noqa: F401
+import app.models.user  # noqa: F401
+from app.models.base import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def tables():
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def sync_db(tables):
+    db = SessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+async def db(tables):
+    """Session of the kind the app uses: async when DATABASE_ASYNC is enabled (the default)."""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        yield db
+        db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+    # Pooled connections belong to this test's event loop
+    await async_engine.dispose()
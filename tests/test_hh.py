@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.crud.sync_state import get_watermark_async
+from app.models.base import run_db
+from app.models.job import Job
+from app.services.hh import create_http_client, ingest_vacancies, sync_key, sync_vacancies
+from benchmarks import hh_stub
+
+pytestmark = pytest.mark.anyio
+
+QUERY = "python developer"
+
+
+@pytest.fixture
+def received() -> list[httpx.Request]:
+    return []
+
+
+@pytest.fixture
+async def client(received):
+    """Client of the hh.ru stub that records the requests it sends."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return hh_stub._handler(request)
+
+    async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+        yield client
+
+
+async def count_jobs(db) -> int:
+    return await run_db(db, lambda session: session.execute(select(func.count(Job.id))).scalar_one())
+
+
+def latest_published_at():
+    # Stored as naive Moscow time, like every other timestamp
+    return hh_stub.LATEST_PUBLISHED_AT.replace(tzinfo=None)
+
+
+async def test_ingest_stores_vacancies(db, client):
+    result = await ingest_vacancies(db, client, QUERY, 50)
+
+    assert (result.added, result.updated, result.skipped, result.errors) == (50, 0, 0, [])
+    assert result.found == hh_stub.TOTAL_VACANCIES
+    assert len(result.ids) == 50
+    assert await count_jobs(db) == 50
+
+
+async def test_ingest_rerun_is_idempotent(db, client):
+    await ingest_vacancies(db, client, QUERY, 50)
+    result = await ingest_vacancies(db, client, QUERY, 50)
+
+    assert (result.added, result.updated, result.skipped) == (0, 0, 50)
+    assert result.ids == []
+    assert await count_jobs(db) == 50
+
+
+async def test_ingest_updates_changed_vacancies(db, client, monkeypatch):
+    await ingest_vacancies(db, client, QUERY, 50)
+
+    vacancy = hh_stub._vacancy
+    monkeypatch.setattr(
+        hh_stub, "_vacancy",
+        lambda query, number: {**vacancy(query, number), "description": "changed"} if number < 3 else vacancy(query, number),
+    )
+    result = await ingest_vacancies(db, client, QUERY, 50)
+
+    assert (result.added, result.updated, result.skipped) == (0, 3, 47)
+    assert await count_jobs(db) == 50
+
+
+async def test_sync_stores_watermark(db, client, received):
+    result = await sync_vacancies(db, client, QUERY, 50)
+
+    assert (result.added, result.errors) == (50, [])
+    assert await get_watermark_async(db, sync_key(QUERY)) == latest_published_at()
+    # A first sync has no watermark to start from
+    assert "date_from" not in received[0].url.params
+    assert received[0].url.params["order_by"] == "publication_time"
+
+
+async def test_sync_fetches_only_vacancies_since_watermark(db, client, received):
+    await sync_vacancies(db, client, QUERY, 50)
+    received.clear()
+
+    result = await sync_vacancies(db, client, QUERY, 50)
+
+    since = hh_stub.LATEST_PUBLISHED_AT - timedelta(seconds=settings.HH_SYNC_OVERLAP)
+    assert received and all(datetime.fromisoformat(request.url.params["date_from"]) == since for request in received)
+    # One vacancy per minute of the overlap window, all of them already stored
+    overlap = settings.HH_SYNC_OVERLAP // 60 + 1
+    assert (result.found, result.added, result.updated, result.skipped) == (overlap, 0, 0, overlap)
+    assert await get_watermark_async(db, sync_key(QUERY)) == latest_published_at()
+    assert await count_jobs(db) == 50
+
+
+async def test_sync_keeps_watermark_when_a_page_fails(db, monkeypatch):
+    monkeypatch.setattr(settings, "HH_BACKOFF", 0)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("page") == "1":
+            return httpx.Response(500)
+        return hh_stub._handler(request)
+
+    async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+        # Two pages of 100, the second one fails
+        result = await sync_vacancies(db, client, QUERY, 200)
+
+    assert result.errors
+    assert result.added == 100
+    assert await get_watermark_async(db, sync_key(QUERY)) is None
@@ -0,0 +1,78 @@
+import pytest
+
+from app.crud.job import SNIPPET_START, SNIPPET_STOP, search_jobs, upsert_jobs
+from app.schemas.job import JobCreate
+
+
+def job(title: str, description: str = "", status: str = "open") -> JobCreate:
+    return JobCreate(
+        title=title,
+        status=status,
+        company_name="Company",
+        company_address="Moscow",
+        logo_url="",
+        description=description,
+    )
+
+
+@pytest.fixture
+def jobs(sync_db):
+    upsert_jobs(sync_db, [
+        job("Python developer", "Django and FastAPI"),
+        job("Java developer", "Spring, some PYTHON scripting"),
+        job("Designer", "Figma"),
+        job("Data engineer", "Airflow, 100% remote", status="closed"),
+        job("Senior Python engineer", "<script>alert(1)</script> python"),
+    ])
+    return sync_db
+
+
+def titles(rows) -> list[str]:
+    return [job.title for job, _, _ in rows]
+
+
+def test_sqlite_uses_like_fallback(jobs):
+    assert jobs.get_bind().dialect.name == "sqlite"
+
+
+def test_matches_title_and_description_case_insensitively(jobs):
+    rows, has_more = search_jobs(jobs, "python", 10)
+
+    # Newest first, every match has the same rank
+    assert titles(rows) == ["Senior Python engineer", "Java developer", "Python developer"]
+    assert {rank for _, rank, _ in rows} == {0.0}
+    assert not has_more
+
+
+def test_wildcards_in_query_are_literal(jobs):
+    rows, _ = search_jobs(jobs, "100%", 10)
+    assert titles(rows) == ["Data engineer"]
+
+    rows, _ = search_jobs(jobs, "_", 10)
+    assert rows == []
+
+
+def test_filters_apply(jobs):
+    rows, _ = search_jobs(jobs, "engineer", 10, status="closed")
+    assert titles(rows) == ["Data engineer"]
+
+
+def test_keyset_pagination(jobs):
+    first, has_more = search_jobs(jobs, "python", 2)
+    assert titles(first) == ["Senior Python engineer", "Java developer"]
+    assert has_more
+
+    last_job, last_rank, _ = first[-1]
+    second, has_more = search_jobs(jobs, "python", 2, after=(last_rank, last_job.id))
+    assert titles(second) == ["Python developer"]
+    assert not has_more
+
+
+def test_snippet_highlights_match_and_escapes_html(jobs):
+    rows, _ = search_jobs(jobs, "scripting", 10)
+    assert rows[0][2] == f"Spring, some PYTHON {SNIPPET_START}scripting{SNIPPET_STOP}"
+
+    rows, _ = search_jobs(jobs, "alert", 10)
+    snippet = rows[0][2]
+    assert "<script>" not in snippet
+    assert f"{SNIPPET_START}alert{SNIPPET_STOP}" in snippet